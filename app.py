@@ -1,10 +1,25 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import partial, wraps
 import io
+import os
+import textwrap
+
+from captable import dilution_from_rounds, ownership_paths
+from derivatives import GRADIENT_INPUTS, elasticities, value_gradients
+from excel_stream import write_excel
+from goalseek import GOAL_VARIABLES, break_even_surface, goal_seek
+from irr import xirr_batch
+from montecarlo import distribution_from_spread, simulate
+from perf import SERVER_TIMINGS, Rerun, RollingTimings, stage, timed
+from scenarios import (DEFAULT_SCENARIOS, evaluate_scenarios, normalized_weights, scenarios_from_json,
+                       scenarios_to_json)
+from sensitivity import grid_columns, iter_grid_rows, sensitivity_grid
+from startup import import_report, lazy_import
+from valuation_core import (anniversary_dates, calculate_present_value, cash_flow_schedule, enterprise_value,
+                            equity_value, value_deals)
+from waterfall import investor_payoff
 
 # Page configuration
 st.set_page_config(
@@ -46,121 +61,1039 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def calculate_present_value(future_value, discount_rate, years):
-    """Calculate present value using discount rate"""
-    return future_value / ((1 + discount_rate) ** years)
-
-def calculate_irr(cash_flows):
-    """Calculate Internal Rate of Return"""
-    # Using numpy's IRR calculation
-    try:
-        # Simple IRR calculation for binary cash flows
-        if len(cash_flows) == 2:
-            initial_investment = abs(cash_flows[0])
-            exit_value = cash_flows[-1]
-            years = len(cash_flows) - 1
-            if initial_investment > 0 and exit_value > 0:
-                return (exit_value / initial_investment) ** (1/years) - 1
-        
-        # For more complex cash flows, use numpy's financial functions
-        return np.irr(cash_flows) if hasattr(np, 'irr') else 0.25  # Default fallback
-    except:
-        return 0.25  # Default 25% if calculation fails
+# Future financing rounds offered when the cap table is switched on
+DEFAULT_ROUNDS = {
+    'Round': ['Series A', 'Series B'],
+    'Pre-Money': [20_000_000.0, 60_000_000.0],
+    'New Money': [5_000_000.0, 20_000_000.0],
+    'Option Pool (%)': [10.0, 5.0]
+}
 
-def main():
-    # Main header
-    st.markdown('<h1 class="main-header">💰 VC Valuation Calculator</h1>', unsafe_allow_html=True)
+def session_timings():
+    """Rolling stage timings of the current browser session"""
+    if 'perf_timings' not in st.session_state:
+        st.session_state['perf_timings'] = RollingTimings()
+        st.session_state['perf_session'] = os.urandom(4).hex()
+    return st.session_state['perf_timings']
+
+def timed_rerun(name):
+    """Time every call of a page or fragment function as one rerun"""
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            sinks = (session_timings(), SERVER_TIMINGS)
+            with Rerun(name, sinks, context={'session': st.session_state['perf_session']}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# Labels of the inputs in the "what moves the needle" panel
+INPUT_LABELS = {
+    'exit_revenue': "Exit Revenue",
+    'ev_revenue_multiple': "EV/Revenue Multiple",
+    'financial_debt': "Financial Debt",
+    'cash_balance': "Cash Balance",
+    'discount_rate': "Required Return",
+    'exit_year': "Exit Year",
+    'equity_stake_entry': "Equity Stake",
+    'dilution_effect': "Dilution"
+}
+NEEDLE_OUTPUTS = {
+    "IRR": 'investor_irr',
+    "Cash Multiple": 'cash_on_cash_multiple',
+    "Present Value": 'present_value',
+    "Investment": 'investment_amount',
+    "Exit Proceeds": 'exit_proceeds'
+}
+
+# Cached pipeline stages. Each stage only takes hashable scalars, so a widget
+# change only recomputes the stages that actually depend on it.
+CACHE_TTL = 3600  # seconds
+CACHE_MAX_ENTRIES = 256
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_valuation(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate, exit_year):
+    """Enterprise value, equity value and present value of the company"""
+    ev = enterprise_value(exit_revenue, ev_revenue_multiple)
+    equity = equity_value(ev, financial_debt, cash_balance)
+    return {
+        'enterprise_value': ev,
+        'equity_value': equity,
+        'present_value': calculate_present_value(equity, discount_rate, exit_year)
+    }
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_investor_metrics(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate,
+                             exit_year, equity_stake_entry, dilution_effect, preference=None):
+    """Investment, exit proceeds, IRR and cash multiple for the investor.
+
+    Valued by value_deals like every other view; preference is None for a
+    pro-rata exit, or (multiple, participating, cap) to pay the investor
+    through the liquidation-preference waterfall. The IRR is NaN when the
+    investment or the exit proceeds are not positive.
+    """
+    deal = value_deals(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                       discount_rate, equity_stake_entry, dilution_effect, preference)
+    return {name: float(deal[name]) for name in ('equity_stake_exit', 'investment_amount', 'exit_proceeds',
+                                                 'investor_irr', 'cash_on_cash_multiple')}
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_projection_tables(valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt,
+                            cash_balance, discount_rate, equity_stake_entry, dilution_effect, preference=None):
+    """Projection and investor cash-flow tables plus the dated cash-flow schedule"""
+    pd = lazy_import('pandas')
+    schedule = cash_flow_schedule(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                  discount_rate, equity_stake_entry, dilution_effect, preference=preference)
+    forecast_year = schedule['forecast_year']
+    years = valuation_date.year + forecast_year
+    cash_flow_dates = pd.DatetimeIndex(anniversary_dates(valuation_date, forecast_year))
+    projection_data = {
+        'Year': years,
+        'Cash Flow Date': cash_flow_dates,
+        'Forecast Year': forecast_year,
+        'Revenue': schedule['revenue'],
+        'Enterprise Value': schedule['enterprise_value'],
+        'Equity Value': schedule['equity_value'],
+        'Discount Factor': schedule['discount_factor'],
+        'Present Value': schedule['present_value']
+    }
     
-    # Sidebar for inputs
-    with st.sidebar:
-        st.markdown('<div class="section-header">📊 Valuation Parameters</div>', unsafe_allow_html=True)
-        
-        # Basic assumptions
-        st.subheader("Basic Assumptions")
-        valuation_date = st.date_input("Valuation Date", datetime.now())
-        exit_year = st.selectbox("Exit Year", range(1, 11), index=6)  # Default Year 7
-        currency = st.selectbox("Currency", ["USD", "EUR", "GBP"], index=0)
+    investor_data = {
+        'Year': years,
+        'Investment': schedule['investment'],
+        'Exit Proceeds': schedule['exit_proceeds'],
+        'Net Cash Flow': schedule['net_cash_flow'],
+        'Equity Stake': schedule['equity_stake']
+    }
+    
+    # XIRR on the actual cash flow dates (ACT/365)
+    investor_xirr = xirr_batch(
+        schedule['net_cash_flow'][None, :],
+        cash_flow_dates.to_numpy(dtype='datetime64[D]')[None, :]
+    )[0]
+    return pd.DataFrame(projection_data), pd.DataFrame(investor_data), cash_flow_dates, float(investor_xirr)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_sensitivity(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                        equity_stake_entry, dilution_effect, preference=None):
+    """Investor IRR across a range of discount rates"""
+    discount_rates = np.arange(0.15, 0.35, 0.01)
+    grid = sensitivity_grid(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                            discount_rates, exit_year, equity_stake_entry, dilution_effect, preference)
+    return discount_rates, grid['irr']
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_heatmap_grid(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                         equity_stake_entry, dilution_effect, preference=None):
+    """Valuation grid over discount rate x EV/Revenue multiple"""
+    discount_rates = np.linspace(0.05, 0.50, 46)
+    multiples = ev_revenue_multiple * np.linspace(0.5, 1.5, 41)
+    return sensitivity_grid(exit_revenue, multiples, financial_debt, cash_balance,
+                            discount_rates, exit_year, equity_stake_entry, dilution_effect, preference)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_input_impacts(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate, exit_year,
+                          equity_stake_entry, dilution_effect, output):
+    """Change in one output for a +1% change in each input, from the closed-form gradients.
+
+    The IRR impact is gradient x input: the IRR change (as a fraction) per
+    +100% of the input, which equals percentage points per +1%. The other
+    outputs move in percent (their elasticity).
+    """
+    result = value_gradients(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                             discount_rate, equity_stake_entry, dilution_effect)
+    if output == 'investor_irr':
+        return {name: float(result['gradient'][output][name] * result['inputs'][name]) for name in GRADIENT_INPUTS}
+    elasticity = elasticities(result)[output]
+    return {name: float(elasticity[name]) for name in GRADIENT_INPUTS}
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_goal_seek(investment_amount, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                      equity_stake_entry, dilution_effect, preference, target_irr, target_multiple):
+    """Value of each goal-seek variable that hits the target with the others held fixed"""
+    return {
+        variable: float(goal_seek(variable, investment_amount, exit_year, exit_revenue, ev_revenue_multiple,
+                                  financial_debt, cash_balance, equity_stake_entry, dilution_effect,
+                                  target_irr=target_irr, target_multiple=target_multiple, preference=preference))
+        for variable in GOAL_VARIABLES
+    }
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_break_even_surface(investment_amount, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                               equity_stake_entry, dilution_effect, preference, solve_for):
+    """Break-even multiple or exit revenue over exit year x discount rate"""
+    return break_even_surface(investment_amount, np.arange(1, 11), np.linspace(0.05, 0.50, 46), exit_revenue,
+                              ev_revenue_multiple, financial_debt, cash_balance, equity_stake_entry,
+                              dilution_effect, solve_for, preference)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_scenarios(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate,
+                      exit_year, equity_stake_entry, dilution_effect, scenarios, preference=None):
+    """Every scenario of the set valued together, with the probability-weighted expected value"""
+    base = {
+        'exit_revenue': exit_revenue,
+        'ev_revenue_multiple': ev_revenue_multiple,
+        'financial_debt': financial_debt,
+        'cash_balance': cash_balance,
+        'discount_rate': discount_rate,
+        'exit_year': exit_year,
+        'equity_stake_entry': equity_stake_entry,
+        'dilution_effect': dilution_effect
+    }
+    return evaluate_scenarios(base, scenarios, preference)
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_pie_figure(enterprise_value, financial_debt, cash_balance):
+    """Valuation breakdown pie chart"""
+    go = lazy_import('plotly.graph_objects')
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=['Enterprise Value', 'Debt', 'Cash'],
+        values=[enterprise_value, financial_debt, cash_balance],
+        hole=0.4,
+        marker_colors=['#3498db', '#e74c3c', '#2ecc71']
+    )])
+    fig_pie.update_layout(
+        title="Valuation Breakdown",
+        height=300,
+        showlegend=True
+    )
+    return fig_pie
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_sensitivity_figure(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                             equity_stake_entry, dilution_effect, preference=None):
+    """IRR vs discount rate line chart"""
+    go = lazy_import('plotly.graph_objects')
+    discount_rates, irr_range = compute_sensitivity(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                                    exit_year, equity_stake_entry, dilution_effect, preference)
+    fig_sensitivity = go.Figure()
+    fig_sensitivity.add_trace(go.Scatter(
+        x=discount_rates * 100,
+        y=irr_range * 100,
+        mode='lines+markers',
+        name='IRR',
+        line=dict(color='#3498db', width=3)
+    ))
+    fig_sensitivity.update_layout(
+        title="IRR Sensitivity to Discount Rate",
+        xaxis_title="Discount Rate (%)",
+        yaxis_title="IRR (%)",
+        height=300
+    )
+    return fig_sensitivity
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_heatmap_figure(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                         equity_stake_entry, dilution_effect, metric, preference=None):
+    """Heatmap of a valuation output over discount rate x EV/Revenue multiple"""
+    go = lazy_import('plotly.graph_objects')
+    grid = compute_heatmap_grid(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                                equity_stake_entry, dilution_effect, preference)
+    if metric == 'IRR':
+        z, colorbar_title = grid['irr'] * 100, "IRR (%)"
+    elif metric == 'Investment':
+        z, colorbar_title = grid['investment'], "Investment"
+    else:
+        z, colorbar_title = grid['present_value'], "Present Value"
+    
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        x=grid['axes']['discount_rate'] * 100,
+        y=grid['axes']['ev_revenue_multiple'],
+        z=z,
+        colorscale='RdYlGn',
+        colorbar=dict(title=colorbar_title)
+    ))
+    fig_heatmap.update_layout(
+        title=f"{metric} by Discount Rate and EV/Revenue Multiple",
+        xaxis_title="Discount Rate (%)",
+        yaxis_title="EV/Revenue Multiple",
+        height=350
+    )
+    return fig_heatmap
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_needle_figure(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate, exit_year,
+                        equity_stake_entry, dilution_effect, metric, preference=None):
+    """Tornado of each input's impact on one output, largest first.
+
+    The closed-form gradients assume pro-rata proceeds, so the chart is
+    labelled pro-rata while liquidation-preference terms are active.
+    """
+    go = lazy_import('plotly.graph_objects')
+    impacts = compute_input_impacts(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate,
+                                    exit_year, equity_stake_entry, dilution_effect, NEEDLE_OUTPUTS[metric])
+    ranked = sorted(impacts, key=lambda name: abs(np.nan_to_num(impacts[name])))
+    unit = "pp" if metric == "IRR" else "%"
+    fig_needle = go.Figure(go.Bar(
+        x=[impacts[name] for name in ranked],
+        y=[INPUT_LABELS[name] for name in ranked],
+        orientation='h',
+        marker_color=['#2ecc71' if impacts[name] >= 0 else '#e74c3c' for name in ranked]
+    ))
+    fig_needle.update_layout(
+        title=f"{metric} Change per +1% in Each Input" + (" (pro-rata)" if preference is not None else ""),
+        xaxis_title=f"Change in {metric} ({unit})",
+        height=320
+    )
+    return fig_needle
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_break_even_figure(investment_amount, exit_year, exit_revenue, ev_revenue_multiple, financial_debt,
+                            cash_balance, discount_rate, equity_stake_entry, dilution_effect, preference, solve_for,
+                            currency):
+    """Contour map of the break-even multiple (or exit revenue), with the current deal marked"""
+    go = lazy_import('plotly.graph_objects')
+    surface = compute_break_even_surface(investment_amount, exit_revenue, ev_revenue_multiple, financial_debt,
+                                         cash_balance, equity_stake_entry, dilution_effect, preference, solve_for)
+    if solve_for == 'ev_revenue_multiple':
+        label, current, hover = "EV/Revenue Multiple (x)", ev_revenue_multiple, "%{z:.2f}x"
+    else:
+        label, current, hover = f"Exit Revenue ({currency})", exit_revenue, "%{z:,.0f}"
+    fig_break_even = go.Figure(go.Contour(
+        x=surface['axes']['discount_rate'] * 100,
+        y=surface['axes']['exit_year'],
+        z=surface[solve_for],
+        colorscale='RdYlGn_r',
+        contours=dict(showlabels=True),
+        colorbar=dict(title=label),
+        hovertemplate=f"Rate %{{x:.0f}}%, year %{{y}}: {hover}<extra></extra>"
+    ))
+    fig_break_even.add_trace(go.Scatter(
+        x=[discount_rate * 100],
+        y=[exit_year],
+        mode='markers+text',
+        marker=dict(color='black', size=10, symbol='x'),
+        text=[f"Current: {current:,.4g}"],
+        textposition='top center',
+        showlegend=False
+    ))
+    fig_break_even.update_layout(
+        title=f"Break-even {label} by Required Return and Exit Year",
+        xaxis_title="Required Return / Target IRR (%)",
+        yaxis_title="Exit Year",
+        height=380
+    )
+    return fig_break_even
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_waterfall_figure(equity_value, equity_stake_exit, investment_amount, preference):
+    """Investor proceeds vs exit equity value, with and without the liquidation preference"""
+    go = lazy_import('plotly.graph_objects')
+    exit_values = np.linspace(0, 2 * max(equity_value, investment_amount), 1001)
+    fig_waterfall = go.Figure()
+    fig_waterfall.add_trace(go.Scatter(
+        x=exit_values,
+        y=investor_payoff(exit_values, equity_stake_exit, investment_amount, *preference),
+        mode='lines',
+        name='With Preference',
+        line=dict(color='#3498db', width=3)
+    ))
+    fig_waterfall.add_trace(go.Scatter(
+        x=exit_values,
+        y=exit_values * equity_stake_exit,
+        mode='lines',
+        name='Pro Rata',
+        line=dict(color='#95a5a6', dash='dash')
+    ))
+    fig_waterfall.add_vline(x=equity_value, line_dash='dot', annotation_text='Base Case')
+    fig_waterfall.update_layout(
+        title="Investor Payoff by Exit Equity Value",
+        xaxis_title="Exit Equity Value",
+        yaxis_title="Investor Proceeds",
+        height=300
+    )
+    return fig_waterfall
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner="Running simulation...")
+def run_monte_carlo(distributions, investment_amount, equity_stake_entry, n_paths, ci_tolerance, seed, workers=1,
+                    preference=None):
+    """Monte Carlo summary statistics and the IRR histogram"""
+    if workers > 1:
+        simulate_parallel = lazy_import('parallel').simulate_parallel
+        result = simulate_parallel(dict(distributions), investment_amount, equity_stake_entry, n_paths=n_paths,
+                                   ci_tolerance=ci_tolerance, seed=seed, workers=workers, preference=preference)
+    else:
+        result = simulate(dict(distributions), investment_amount, equity_stake_entry, n_paths=n_paths,
+                          ci_tolerance=ci_tolerance, seed=seed, preference=preference)
+    irr_stats = result['stats']['irr']
+    return {
+        'n_paths': result['n_paths'],
+        'converged': result['converged'],
+        'summary': {name: stats.summary() for name, stats in result['stats'].items()},
+        'irr_edges': irr_stats.edges,
+        'irr_counts': irr_stats.counts[1:-1]
+    }
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_monte_carlo_figure(irr_edges, irr_counts):
+    """Histogram of simulated investor IRRs"""
+    go = lazy_import('plotly.graph_objects')
+    populated = np.flatnonzero(irr_counts)
+    window = slice(populated[0], populated[-1] + 1) if populated.size else slice(None)
+    centers = (irr_edges[:-1] + irr_edges[1:]) / 2
+    fig_mc = go.Figure(go.Bar(
+        x=centers[window] * 100,
+        y=irr_counts[window],
+        marker_color='#3498db'
+    ))
+    fig_mc.update_layout(
+        title="Simulated IRR Distribution",
+        xaxis_title="IRR (%)",
+        yaxis_title="Paths",
+        bargap=0,
+        height=300
+    )
+    return fig_mc
+
+def scenario_table(evaluated):
+    """Scenario results plus the expected-value row as a typed table (formatting is left to the display)"""
+    pd = lazy_import('pandas')
+    results, expected = evaluated['results'], evaluated['expected']
+    columns = {'Present Value': 'present_value', 'Investment': 'investment_amount', 'IRR': 'investor_irr',
+               'Multiple': 'cash_on_cash_multiple'}
+    table = {
+        'Scenario': evaluated['names'] + ["Expected (First Chicago)"],
+        'Probability': np.append(evaluated['weights'], evaluated['weights'].sum())
+    }
+    table.update({label: np.append(results[name], expected[name]) for label, name in columns.items()})
+    return pd.DataFrame(table)
+
+OVERRIDE_LABELS = {'factor': "Factor", 'absolute': "Absolute"}
+
+def scenario_tables(scenarios):
+    """Scenario set as the weights and overrides tables of the editor"""
+    pd = lazy_import('pandas')
+    weights = pd.DataFrame({
+        'Scenario': [scenario['name'] for scenario in scenarios],
+        'Weight': [float(scenario.get('weight', 1.0)) for scenario in scenarios]
+    })
+    overrides = pd.DataFrame(
+        [(scenario['name'], INPUT_LABELS[name], OVERRIDE_LABELS[mode], float(value))
+         for scenario in scenarios for name, (mode, value) in scenario['overrides'].items()],
+        columns=['Scenario', 'Input', 'Mode', 'Value']
+    )
+    return weights, overrides
+
+def scenarios_from_tables(weights, overrides):
+    """Scenario set from the edited tables; incomplete rows are skipped"""
+    pd = lazy_import('pandas')
+    inputs = {label: name for name, label in INPUT_LABELS.items()}
+    modes = {label: mode for mode, label in OVERRIDE_LABELS.items()}
+    scenarios = {}
+    for name, weight in zip(weights['Scenario'], weights['Weight']):
+        if pd.isna(name) or not str(name).strip():
+            continue
+        name = str(name).strip()
+        if name in scenarios:
+            raise ValueError(f"Scenario {name} is defined twice")
+        scenarios[name] = {'name': name, 'weight': 0.0 if pd.isna(weight) else float(weight), 'overrides': {}}
+    for row in overrides.dropna().itertuples(index=False):
+        scenario = scenarios.get(str(row.Scenario).strip())
+        if scenario is None:
+            raise ValueError(f"Override for unknown scenario {row.Scenario}")
+        scenario['overrides'][inputs[row.Input]] = (modes[row.Mode], float(row.Value))
+    scenarios = list(scenarios.values())
+    normalized_weights([scenario['weight'] for scenario in scenarios])
+    return scenarios
+
+def load_scenarios(scenarios):
+    """Restart the scenario editor from another scenario set"""
+    st.session_state['scenario_editor_base'] = scenarios
+    st.session_state['scenario_editor_version'] = st.session_state.get('scenario_editor_version', 0) + 1
+    st.rerun()
+
+def money_column(label, currency):
+    return st.column_config.NumberColumn(f"{label} ({currency})", format="localized")
+
+def projection_column_config(currency):
+    """Display formats for the projection table"""
+    return {
+        'Year': st.column_config.NumberColumn(format="%d"),
+        'Cash Flow Date': st.column_config.DateColumn(format="DD-MMM-YYYY"),
+        'Forecast Year': st.column_config.NumberColumn(format="Year %d"),
+        'Revenue': money_column('Revenue', currency),
+        'Enterprise Value': money_column('Enterprise Value', currency),
+        'Equity Value': money_column('Equity Value', currency),
+        'Discount Factor': st.column_config.NumberColumn(format="%.4f"),
+        'Present Value': money_column('Present Value', currency)
+    }
+
+def investor_column_config(currency):
+    """Display formats for the investor cash-flow table"""
+    return {
+        'Year': st.column_config.NumberColumn(format="%d"),
+        'Investment': money_column('Investment', currency),
+        'Exit Proceeds': money_column('Exit Proceeds', currency),
+        'Net Cash Flow': money_column('Net Cash Flow', currency),
+        'Equity Stake': st.column_config.NumberColumn(format="percent")
+    }
+
+def scenario_column_config(currency):
+    """Display formats for the scenario table"""
+    return {
+        'Probability': st.column_config.NumberColumn(format="percent"),
+        'Present Value': money_column('Present Value', currency),
+        'IRR': st.column_config.NumberColumn(format="percent"),
+        'Multiple': st.column_config.NumberColumn(format="%.1fx"),
+        'Investment': money_column('Investment', currency)
+    }
+
+def valuation_report(valuation_date, exit_year, currency, exit_revenue, ev_revenue_multiple, discount_rate,
+                     equity_stake_entry, equity_value, present_value, investor_irr, cash_on_cash_multiple,
+                     investment_amount):
+    """Markdown summary of one valuation"""
+    return textwrap.dedent(f"""
+    # VC Valuation Report
+    
+    **Valuation Date:** {valuation_date}
+    **Exit Year:** Year {exit_year}
+    **Currency:** {currency}
+    
+    ## Key Metrics
+    - **Company Equity Value:** {currency} {equity_value:,.0f}
+    - **Present Value:** {currency} {present_value:,.0f}
+    - **Investor IRR:** {f'{investor_irr:.1%}' if np.isfinite(investor_irr) else 'n/a'}
+    - **Cash Multiple:** {cash_on_cash_multiple:.1f}x
+    - **Investment Required:** {currency} {investment_amount:,.0f}
+    
+    ## Assumptions
+    - **Exit Revenue:** {currency} {exit_revenue:,.0f}
+    - **EV/Revenue Multiple:** {ev_revenue_multiple:.1f}x
+    - **Discount Rate:** {discount_rate:.1%}
+    - **Equity Stake:** {equity_stake_entry:.1%}
+    """)
+
+@timed('excel_export')
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_excel_export(valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt,
+                       cash_balance, discount_rate, equity_stake_entry, dilution_effect, preference,
+                       scenarios=DEFAULT_SCENARIOS):
+    """Excel workbook bytes for one set of inputs"""
+    df, df_investor, _, _ = build_projection_tables(
+        valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+        discount_rate, equity_stake_entry, dilution_effect, preference
+    )
+    scenario_results = compute_scenarios(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                         discount_rate, exit_year, equity_stake_entry, dilution_effect, scenarios,
+                                         preference)
+    df_scenarios = scenario_table(scenario_results)
+    
+    grid = compute_heatmap_grid(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                                equity_stake_entry, dilution_effect, preference)
+    
+    # Sheets are streamed row-chunk by row-chunk through a write-only workbook
+    lazy_import('openpyxl')
+    output = io.BytesIO()
+    write_excel(output, {
+        'Projections': (df.columns, [df]),
+        'Investor_Flows': (df_investor.columns, [df_investor]),
+        'Scenarios': (df_scenarios.columns, [df_scenarios]),
+        'Sensitivity_Grid': (grid_columns(grid), iter_grid_rows(grid))
+    })
+    return output.getvalue()
+
+@timed('columnar_export')
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_columnar_export(valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt,
+                          cash_balance, discount_rate, equity_stake_entry, dilution_effect, preference, format,
+                          scenarios=DEFAULT_SCENARIOS):
+    """Zip of Parquet/Arrow files with the result tables, built from the numeric arrays"""
+    df, df_investor, _, _ = build_projection_tables(
+        valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+        discount_rate, equity_stake_entry, dilution_effect, preference
+    )
+    scenario_results = compute_scenarios(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                         discount_rate, exit_year, equity_stake_entry, dilution_effect, scenarios,
+                                         preference)
+    grid = compute_heatmap_grid(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                                equity_stake_entry, dilution_effect, preference)
+    
+    arrow_export = lazy_import('arrow_export')
+    return arrow_export.export_tables({
+        'projections': df,
+        'investor_flows': df_investor,
+        'scenarios': scenario_table(scenario_results),
+        'sensitivity_grid': iter_grid_rows(grid)
+    }, format=format)
+
+@timed('monte_carlo_export')
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_monte_carlo_export(distributions, investment_amount, equity_stake_entry, n_paths, ci_tolerance, seed,
+                             workers, format, preference=None):
+    """Zip of Parquet/Arrow files with the Monte Carlo summary and IRR histogram"""
+    mc = run_monte_carlo(distributions, investment_amount, equity_stake_entry, n_paths, ci_tolerance, seed, workers,
+                         preference)
+    metrics = list(mc['summary'])
+    quantiles = list(mc['summary']['irr']['quantiles'])
+    summary = {
+        'metric': np.array(metrics),
+        'mean': np.array([mc['summary'][name]['mean'] for name in metrics]),
+        'std': np.array([mc['summary'][name]['std'] for name in metrics]),
+        'ci_halfwidth': np.array([mc['summary'][name]['ci_halfwidth'] for name in metrics])
+    }
+    for q in quantiles:
+        summary[f"p{q * 100:g}"] = np.array([mc['summary'][name]['quantiles'][q] for name in metrics])
+    
+    arrow_export = lazy_import('arrow_export')
+    return arrow_export.export_tables({
+        'monte_carlo_summary': summary,
+        'irr_histogram': {
+            'irr_low': mc['irr_edges'][:-1],
+            'irr_high': mc['irr_edges'][1:],
+            'paths': mc['irr_counts']
+        }
+    }, format=format)
+
+@st.fragment
+@timed_rerun('monte_carlo_panel')
+def monte_carlo_panel(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                      equity_stake_entry, dilution_effect, investment_amount, preference):
+    """Monte Carlo expander; its distribution widgets only rerun this panel"""
+    with st.expander("🎲 Monte Carlo Simulation"):
+        mc_col1, mc_col2 = st.columns(2)
+        with mc_col1:
+            revenue_dist = st.selectbox("Exit Revenue Distribution", ["lognormal", "normal", "triangular", "uniform", "fixed"])
+            revenue_spread = st.slider("Exit Revenue Volatility (%)", 0, 100, 40) / 100
+            multiple_dist = st.selectbox("EV/Revenue Multiple Distribution", ["triangular", "lognormal", "normal", "uniform", "fixed"])
+            multiple_spread = st.slider("Multiple Volatility (%)", 0, 100, 30) / 100
+            balance_spread = st.slider("Debt / Cash Volatility (%)", 0, 100, 20) / 100
+        with mc_col2:
+            base_dilution = min(round(dilution_effect * 100, 1), 90.0)
+            dilution_range = st.slider("Dilution Range (%)", 0.0, 90.0, (base_dilution, min(base_dilution + 20, 90.0)))
+            exit_year_spread = st.slider("Exit Year Range (± years)", 0, 3, 1)
+            n_paths = st.select_slider("Paths", options=[10_000, 100_000, 1_000_000, 10_000_000, 100_000_000], value=1_000_000)
+            workers = st.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=1)
+            ci_tolerance = st.number_input("Stop when IRR 95% CI is within (bp)", min_value=0, value=10, step=5) / 10000
         
-        # Financial projections
-        st.subheader("Financial Projections")
-        exit_revenue = st.number_input(
-            f"Revenue in Year {exit_year} ({currency})", 
-            min_value=0, 
-            value=10000000, 
-            step=100000,
-            format="%d"
+        exit_years = [year for year in range(exit_year - exit_year_spread, exit_year + exit_year_spread + 1) if year >= 1]
+        distributions = (
+            ('exit_revenue', distribution_from_spread(revenue_dist, exit_revenue, revenue_spread)),
+            ('ev_revenue_multiple', distribution_from_spread(multiple_dist, ev_revenue_multiple, multiple_spread)),
+            ('financial_debt', distribution_from_spread('normal', financial_debt, balance_spread)),
+            ('cash_balance', distribution_from_spread('normal', cash_balance, balance_spread)),
+            ('dilution_effect', ('uniform', dilution_range[0] / 100, dilution_range[1] / 100)),
+            ('exit_year', ('discrete', tuple(exit_years), tuple([1 / len(exit_years)] * len(exit_years))))
         )
         
-        ev_revenue_multiple = st.number_input(
-            "EV/Revenue Multiple", 
-            min_value=0.1, 
-            value=10.0, 
-            step=0.1,
-            format="%.1f"
-        )
+        if investment_amount > 0 and st.checkbox("Run Monte Carlo", value=False):
+            with stage('monte_carlo'):
+                mc = run_monte_carlo(distributions, investment_amount, equity_stake_entry, n_paths,
+                                     ci_tolerance or None, seed=42, workers=workers, preference=preference)
+            irr_summary = mc['summary']['irr']
+            multiple_summary = mc['summary']['multiple']
+            
+            mc_metric1, mc_metric2, mc_metric3, mc_metric4 = st.columns(4)
+            mc_metric1.metric("Mean IRR", f"{irr_summary['mean']:.1%}", delta=f"± {irr_summary['ci_halfwidth']:.2%}")
+            mc_metric2.metric("Median IRR", f"{irr_summary['quantiles'][0.5]:.1%}")
+            mc_metric3.metric("IRR 5th–95th", f"{irr_summary['quantiles'][0.05]:.0%} – {irr_summary['quantiles'][0.95]:.0%}")
+            mc_metric4.metric("Mean Multiple", f"{multiple_summary['mean']:.1f}x")
+            with stage('monte_carlo_figure'):
+                fig_mc = build_monte_carlo_figure(mc['irr_edges'], mc['irr_counts'])
+            with stage('monte_carlo_chart'):
+                st.plotly_chart(fig_mc, use_container_width=True)
+            stop_note = "stopped early, CI within tolerance" if mc['converged'] else "all paths drawn"
+            payoff_note = "; exits paid through the liquidation preference" if preference is not None else ""
+            st.caption(f"{mc['n_paths']:,} paths ({stop_note}{payoff_note})")
+            st.download_button(
+                label="Download Simulation (Parquet)",
+                data=partial(build_monte_carlo_export, distributions, investment_amount, equity_stake_entry,
+                             n_paths, ci_tolerance or None, 42, workers, 'parquet', preference),
+                file_name=f"VC_Monte_Carlo_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip",
+                on_click="ignore"
+            )
+
+@st.fragment
+@timed_rerun('goal_seek_panel')
+def goal_seek_panel(investment_amount, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                    discount_rate, equity_stake_entry, dilution_effect, preference, currency):
+    """Goal seek expander; solving only reruns this panel"""
+    with st.expander("🎯 Goal Seek"):
+        gs_col1, gs_col2, gs_col3 = st.columns(3)
+        with gs_col1:
+            target_kind = st.radio("Target", ["IRR", "Cash Multiple"], horizontal=True)
+        with gs_col2:
+            if target_kind == "IRR":
+                target_irr = st.number_input("Target IRR (%)", min_value=-99.0, value=30.0, step=1.0) / 100
+                target_multiple = None
+            else:
+                target_multiple = st.number_input("Target Multiple (x)", min_value=0.0, value=5.0, step=0.5)
+                target_irr = None
+        with gs_col3:
+            cheque = st.number_input(f"Investment ({currency})", min_value=1.0, value=float(max(investment_amount, 1.0)),
+                                     step=100_000.0, format="%.0f")
         
-        financial_debt = st.number_input(
-            f"Financial Debt in Year {exit_year} ({currency})", 
-            min_value=0, 
-            value=0, 
-            step=10000,
-            format="%d"
+        with stage('goal_seek'):
+            solved = compute_goal_seek(cheque, exit_year, exit_revenue, ev_revenue_multiple, financial_debt,
+                                       cash_balance, equity_stake_entry, dilution_effect, preference,
+                                       target_irr, target_multiple)
+        pd = lazy_import('pandas')
+        current_pre_money = cheque / equity_stake_entry - cheque
+        st.dataframe(
+            pd.DataFrame({
+                'Solve For': ["Equity Stake at Entry", f"Pre-Money ({currency})", "EV/Revenue Multiple",
+                              f"Exit Revenue ({currency})"],
+                'Required': [solved[variable] for variable in GOAL_VARIABLES],
+                'Current': [equity_stake_entry, current_pre_money, ev_revenue_multiple, exit_revenue]
+            }),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Required': st.column_config.NumberColumn(format="%.4g"),
+                'Current': st.column_config.NumberColumn(format="%.4g")
+            }
         )
+        st.caption("Each row moves one input with the others held at their current values; "
+                   "blank means the target is out of reach (e.g. a stake above 100%). "
+                   "Pre-money is the valuation at which the investment buys the required stake.")
         
-        cash_balance = st.number_input(
-            f"Cash Balance in Year {exit_year} ({currency})", 
-            min_value=0, 
-            value=0, 
-            step=10000,
-            format="%d"
+        # Break-even map for IC memos: the target IRR swept with the exit year
+        st.markdown("**Break-even Surface**")
+        break_even_variable = st.radio("Break-even On", ["EV/Revenue Multiple", "Exit Revenue"], horizontal=True)
+        solve_for = 'ev_revenue_multiple' if break_even_variable == "EV/Revenue Multiple" else 'exit_revenue'
+        with stage('break_even_figure'):
+            fig_break_even = build_break_even_figure(cheque, exit_year, exit_revenue, ev_revenue_multiple,
+                                                     financial_debt, cash_balance, discount_rate, equity_stake_entry,
+                                                     dilution_effect, preference, solve_for, currency)
+        with stage('break_even_chart'):
+            st.plotly_chart(fig_break_even, use_container_width=True)
+        st.caption(f"Minimum {break_even_variable} at which the investment earns each required return "
+                   "over each holding period, other inputs held fixed. The deal clears its hurdle where the "
+                   "current value is above the contour.")
+
+@st.fragment
+@timed_rerun('visualization_panel')
+def visualization_panel(enterprise_value, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                        discount_rate, exit_year, equity_stake_entry, dilution_effect, preference):
+    """Charts; the heatmap metric and needle output only rerun this panel"""
+    st.markdown('<div class="section-header">📊 Visualizations</div>', unsafe_allow_html=True)
+    
+    # Valuation breakdown pie chart
+    with stage('pie_figure'):
+        fig_pie = build_pie_figure(enterprise_value, financial_debt, cash_balance)
+    with stage('pie_chart'):
+        st.plotly_chart(fig_pie, use_container_width=True)
+    
+    # IRR sensitivity analysis
+    with stage('sensitivity_figure'):
+        fig_sensitivity = build_sensitivity_figure(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                                   exit_year, equity_stake_entry, dilution_effect, preference)
+    with stage('sensitivity_chart'):
+        st.plotly_chart(fig_sensitivity, use_container_width=True)
+    
+    # Two-way sensitivity heatmap
+    heatmap_metric = st.radio("Heatmap Metric", ["Present Value", "Investment", "IRR"], horizontal=True)
+    with stage('heatmap_figure'):
+        fig_heatmap = build_heatmap_figure(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                           exit_year, equity_stake_entry, dilution_effect, heatmap_metric,
+                                           preference)
+    with stage('heatmap_chart'):
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+    
+    # Exact gradients: which input moves the chosen output most
+    st.subheader("What Moves the Needle")
+    needle_metric = st.selectbox("Output", list(NEEDLE_OUTPUTS), key="needle_metric")
+    with stage('needle_figure'):
+        fig_needle = build_needle_figure(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                         discount_rate, exit_year, equity_stake_entry, dilution_effect,
+                                         needle_metric, preference)
+    with stage('needle_chart'):
+        st.plotly_chart(fig_needle, use_container_width=True)
+    if preference is not None:
+        st.caption("Exact gradients of the pro-rata model: the liquidation preference is not reflected here.")
+
+def scenario_panel(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate, exit_year,
+                   equity_stake_entry, dilution_effect, preference, currency):
+    """Scenario editor and results; returns the scenario set in use"""
+    st.subheader("Scenario Analysis")
+    
+    # The editors start from a fixed base so their edits are not applied twice;
+    # loading a set swaps the base and remounts them under a new key
+    base_scenarios = st.session_state.setdefault('scenario_editor_base', DEFAULT_SCENARIOS)
+    version = st.session_state.setdefault('scenario_editor_version', 0)
+    saved_sets = st.session_state.setdefault('saved_scenario_sets', {"Default": DEFAULT_SCENARIOS})
+    
+    with st.expander("✏️ Edit Scenarios"):
+        weights_df, overrides_df = scenario_tables(base_scenarios)
+        edited_weights = st.data_editor(
+            weights_df,
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            key=f"scenario_weights_{version}",
+            column_config={'Weight': st.column_config.NumberColumn(min_value=0.0, format="%.3g",
+                                                                   help="Relative weight, normalized to a probability")}
         )
+        edited_overrides = st.data_editor(
+            overrides_df,
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            key=f"scenario_overrides_{version}",
+            column_config={
+                'Input': st.column_config.SelectboxColumn(options=list(INPUT_LABELS.values()), required=True),
+                'Mode': st.column_config.SelectboxColumn(options=list(OVERRIDE_LABELS.values()), required=True),
+                'Value': st.column_config.NumberColumn(format="%.4g", required=True)
+            }
+        )
+        st.caption("A factor multiplies the base-case input, an absolute value replaces it "
+                   "(rates and stakes as fractions, 0.25 = 25%). Inputs without an override keep the sidebar value.")
+        try:
+            scenarios = scenarios_from_tables(edited_weights, edited_overrides)
+        except ValueError as error:
+            st.error(f"Scenario set not applied: {error}")
+            scenarios = base_scenarios
         
-        # Discount rate
-        st.subheader("Valuation Assumptions")
-        discount_rate = st.slider(
-            "Required Return (%)", 
-            min_value=5.0, 
-            max_value=50.0, 
-            value=25.0, 
-            step=0.5
-        ) / 100
-        
-        # Investor assumptions
-        st.subheader("Investor Assumptions")
-        equity_stake_entry = st.slider(
-            "Equity Stake at Entry (%)", 
-            min_value=1.0, 
-            max_value=100.0, 
-            value=10.0, 
-            step=0.1
-        ) / 100
+        save_col, load_col, file_col = st.columns(3)
+        with save_col:
+            set_name = st.text_input("Set Name", value="My Scenarios")
+            if st.button("Save Set") and set_name:
+                saved_sets[set_name] = scenarios
+                st.toast(f"Saved scenario set {set_name}")
+        with load_col:
+            load_name = st.selectbox("Saved Sets", list(saved_sets))
+            if st.button("Load Set"):
+                load_scenarios(saved_sets[load_name])
+        with file_col:
+            st.download_button("Download Set (JSON)", scenarios_to_json(scenarios), file_name="scenarios.json",
+                               mime="application/json", on_click="ignore")
+            uploaded = st.file_uploader("Upload Set (JSON)", type="json")
+            if uploaded is not None and st.button("Load Upload"):
+                try:
+                    loaded = scenarios_from_json(uploaded.getvalue())
+                except (ValueError, KeyError, TypeError) as error:
+                    st.error(f"Not a scenario set: {error!r}")
+                else:
+                    load_scenarios(loaded)
+    
+    with stage('scenarios'):
+        evaluated = compute_scenarios(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                      discount_rate, exit_year, equity_stake_entry, dilution_effect, scenarios,
+                                      preference)
+        df_scenarios = scenario_table(evaluated)
+    with stage('scenario_dataframe'):
+        st.dataframe(df_scenarios, use_container_width=True, hide_index=True,
+                     column_config=scenario_column_config(currency))
+    st.caption("Each scenario is priced at its own present value; the last row is the probability-weighted "
+               "(First Chicago) expected value of every column.")
+    return scenarios
+
+@st.fragment
+@timed_rerun('export_panel')
+def export_panel(valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                 discount_rate, equity_stake_entry, dilution_effect, preference, scenarios, currency, equity_value,
+                 present_value, investor_irr, cash_on_cash_multiple, investment_amount):
+    """Download buttons; the report button and format choice only rerun this panel"""
+    st.markdown('<div class="section-header">📁 Export Results</div>', unsafe_allow_html=True)
+    
+    col_export1, col_export2, col_export3 = st.columns(3)
+    
+    with col_export1:
+        # Workbook bytes are only built when the download is requested, and are
+        # cached per set of inputs across reruns and sessions
+        st.download_button(
+            label="📊 Export to Excel",
+            data=partial(build_excel_export, valuation_date, exit_year, exit_revenue, ev_revenue_multiple,
+                         financial_debt, cash_balance, discount_rate, equity_stake_entry, dilution_effect,
+                         preference, scenarios=scenarios),
+            file_name=f"VC_Valuation_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            on_click="ignore",
+            type="primary"
+        )
+    
+    with col_export2:
+        if st.button("📈 Generate Report", type="secondary"):
+            report = valuation_report(valuation_date, exit_year, currency, exit_revenue, ev_revenue_multiple,
+                                      discount_rate, equity_stake_entry, equity_value, present_value,
+                                      investor_irr, cash_on_cash_multiple, investment_amount)
+            
+            st.download_button(
+                label="Download Report (Markdown)",
+                data=report,
+                file_name=f"VC_Report_{datetime.now().strftime('%Y%m%d')}.md",
+                mime="text/markdown"
+            )
+
+    with col_export3:
+        columnar_format = st.selectbox("Columnar Format", ["Parquet", "Arrow IPC"], label_visibility="collapsed")
+        format_key = 'parquet' if columnar_format == "Parquet" else 'ipc'
+        st.download_button(
+            label=f"🗃 Export to {columnar_format}",
+            data=partial(build_columnar_export, valuation_date, exit_year, exit_revenue, ev_revenue_multiple,
+                         financial_debt, cash_balance, discount_rate, equity_stake_entry, dilution_effect,
+                         preference, format_key, scenarios),
+            file_name=f"VC_Valuation_{datetime.now().strftime('%Y%m%d')}_{format_key}.zip",
+            mime="application/zip",
+            on_click="ignore"
+        )
+
+def timings_table(timings):
+    """Rolling stage percentiles as a table, slowest p90 first"""
+    pd = lazy_import('pandas')
+    summary = pd.DataFrame.from_dict(timings.summary(), orient='index')
+    return summary.sort_values('p90_ms', ascending=False) if len(summary) else summary
+
+def performance_panel():
+    with st.expander("⏱ Performance", expanded=True):
+        st.caption("Rolling stage timings in ms; earlier reruns only, the current one is logged when it ends")
+        session_col, server_col = st.columns(2)
+        with session_col:
+            st.markdown("**This session**")
+            st.dataframe(timings_table(session_timings()), use_container_width=True)
+        with server_col:
+            st.markdown("**All sessions**")
+            st.dataframe(timings_table(SERVER_TIMINGS), use_container_width=True)
+        st.markdown("**Lazy imports (ms)**")
+        st.json({name: round(seconds * 1000, 1) for name, seconds in import_report().items()})
+
+@timed_rerun('rerun')
+def main():
+    # Main header
+    st.markdown('<h1 class="main-header">💰 VC Valuation Calculator</h1>', unsafe_allow_html=True)
+    
+    # Sidebar for inputs
+    with stage('inputs'), st.sidebar:
+        st.markdown('<div class="section-header">📊 Valuation Parameters</div>', unsafe_allow_html=True)
         
-        dilution_effect = st.slider(
-            "Dilution Effect (%)", 
-            min_value=0.0, 
-            max_value=50.0, 
-            value=0.0, 
-            step=0.1
-        ) / 100
+        # Batch mode: edits are collected and applied in a single rerun on submit
+        batch_inputs = st.toggle("Apply inputs on submit", value=False)
+        # Explicit keys keep every input's value when the widgets move into or out of the form
+        inputs = st.form("inputs", border=False) if batch_inputs else st.container()
+        with inputs:
+            # Basic assumptions
+            st.subheader("Basic Assumptions")
+            valuation_date = st.date_input("Valuation Date", datetime.now(), key="valuation_date")
+            exit_year = st.selectbox("Exit Year", range(1, 11), index=6, key="exit_year")  # Default Year 7
+            currency = st.selectbox("Currency", ["USD", "EUR", "GBP"], index=0, key="currency")
+            
+            # Financial projections
+            st.subheader("Financial Projections")
+            exit_revenue = st.number_input(
+                f"Revenue in Year {exit_year} ({currency})", 
+                min_value=0, 
+                value=10000000, 
+                step=100000,
+                format="%d",
+                key="exit_revenue"
+            )
+            
+            ev_revenue_multiple = st.number_input(
+                "EV/Revenue Multiple", 
+                min_value=0.1, 
+                value=10.0, 
+                step=0.1,
+                format="%.1f",
+                key="ev_revenue_multiple"
+            )
+            
+            financial_debt = st.number_input(
+                f"Financial Debt in Year {exit_year} ({currency})", 
+                min_value=0, 
+                value=0, 
+                step=10000,
+                format="%d",
+                key="financial_debt"
+            )
+            
+            cash_balance = st.number_input(
+                f"Cash Balance in Year {exit_year} ({currency})", 
+                min_value=0, 
+                value=0, 
+                step=10000,
+                format="%d",
+                key="cash_balance"
+            )
+            
+            # Discount rate
+            st.subheader("Valuation Assumptions")
+            discount_rate = st.slider(
+                "Required Return (%)", 
+                min_value=5.0, 
+                max_value=50.0, 
+                value=25.0, 
+                step=0.5,
+                key="discount_rate"
+            ) / 100
+            
+            # Investor assumptions
+            st.subheader("Investor Assumptions")
+            equity_stake_entry = st.slider(
+                "Equity Stake at Entry (%)", 
+                min_value=1.0, 
+                max_value=100.0, 
+                value=10.0, 
+                step=0.1,
+                key="equity_stake_entry"
+            ) / 100
+            
+            use_cap_table = st.checkbox("Model future rounds (cap table)", value=False, key="use_cap_table")
+            if use_cap_table:
+                pd = lazy_import('pandas')
+                rounds = st.data_editor(
+                    pd.DataFrame(DEFAULT_ROUNDS),
+                    num_rows="dynamic",
+                    column_config={
+                        'Pre-Money': st.column_config.NumberColumn(f"Pre-Money ({currency})", min_value=0, format="localized"),
+                        'New Money': st.column_config.NumberColumn(f"New Money ({currency})", min_value=0, format="localized"),
+                        'Option Pool (%)': st.column_config.NumberColumn(min_value=0.0, max_value=100.0, format="%.1f%%")
+                    },
+                    key="rounds"
+                ).dropna()
+                pool_in_pre_money = st.checkbox("Option pool in pre-money", value=True, key="pool_in_pre_money")
+                round_inputs = (rounds['Pre-Money'].to_numpy(dtype=float), rounds['New Money'].to_numpy(dtype=float),
+                                rounds['Option Pool (%)'].to_numpy(dtype=float) / 100)
+                dilution_effect = float(dilution_from_rounds(*round_inputs, pool_in_pre_money=pool_in_pre_money)) if len(rounds) else 0.0
+                st.caption(f"Dilution across {len(rounds)} rounds: {dilution_effect:.1%}")
+            else:
+                dilution_effect = st.slider(
+                    "Dilution Effect (%)", 
+                    min_value=0.0, 
+                    max_value=50.0, 
+                    value=0.0, 
+                    step=0.1,
+                    key="dilution_effect"
+                ) / 100
+            
+            use_preference = st.checkbox("Liquidation preference", value=False, key="use_preference")
+            if use_preference:
+                preference_multiple = st.number_input("Preference Multiple (x)", min_value=0.0, value=1.0, step=0.25,
+                                                      key="preference_multiple")
+                participating = st.checkbox("Participating", value=False, key="participating")
+                cap = st.number_input("Participation Cap (x, 0 = uncapped)", min_value=0.0, value=0.0, step=0.5,
+                                      disabled=not participating, key="participation_cap")
+                if participating and 0 < cap < preference_multiple:
+                    # A cap below the preference would pay less as the exit grows
+                    st.warning(f"The participation cap can't be below the preference; "
+                               f"using {preference_multiple:g}x.")
+                    cap = preference_multiple
+                preference = (preference_multiple, participating, cap if participating and cap > 0 else None)
+            else:
+                preference = None
+            
+            if batch_inputs:
+                st.form_submit_button("Apply", type="primary", use_container_width=True)
         
     # Main content area
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        # Calculate valuation
-        enterprise_value = exit_revenue * ev_revenue_multiple
-        equity_value = enterprise_value - financial_debt + cash_balance
-        present_value = calculate_present_value(equity_value, discount_rate, exit_year)
-        
-        # Calculate investor metrics
-        equity_stake_exit = equity_stake_entry * (1 - dilution_effect)
-        investment_amount = present_value * equity_stake_entry
-        exit_proceeds = equity_value * equity_stake_exit
-        
-        # Calculate IRR and multiples
-        cash_flows = [-investment_amount, exit_proceeds]
-        investor_irr = calculate_irr(cash_flows)
-        cash_on_cash_multiple = exit_proceeds / investment_amount if investment_amount > 0 else 0
+        with stage('valuation'):
+            # Calculate valuation
+            valuation = compute_valuation(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                          discount_rate, exit_year)
+            enterprise_value = valuation['enterprise_value']
+            equity_value = valuation['equity_value']
+            present_value = valuation['present_value']
+            
+            # Calculate investor metrics
+            metrics = compute_investor_metrics(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                               discount_rate, exit_year, equity_stake_entry, dilution_effect,
+                                               preference)
+        equity_stake_exit = metrics['equity_stake_exit']
+        investment_amount = metrics['investment_amount']
+        investor_irr = metrics['investor_irr']
+        cash_on_cash_multiple = metrics['cash_on_cash_multiple']
         
         # Display key metrics
         st.markdown('<div class="section-header">📈 Valuation Results</div>', unsafe_allow_html=True)
@@ -184,7 +1117,7 @@ def main():
         with metric_col3:
             st.metric(
                 "Investor IRR", 
-                f"{investor_irr:.1%}",
+                f"{investor_irr:.1%}" if np.isfinite(investor_irr) else "n/a",
                 delta="Annual Return"
             )
         
@@ -198,159 +1131,76 @@ def main():
         # Detailed calculations table
         st.markdown('<div class="section-header">📊 Detailed Calculations</div>', unsafe_allow_html=True)
         
-        # Create projection table
-        years = list(range(2023, 2023 + exit_year + 4))
-        projection_data = {
-            'Year': years,
-            'Cash Flow Date': [f"31-Dec-{year}" for year in years],
-            'Forecast Year': [f"Year {i-2023}" for i in years],
-            'Revenue': [exit_revenue if i-2023 == exit_year else 0 for i in years],
-            'Enterprise Value': [enterprise_value if i-2023 == exit_year else 0 for i in years],
-            'Equity Value': [equity_value if i-2023 == exit_year else 0 for i in years],
-            'Discount Factor': [1/((1+discount_rate)**(i-2023)) for i in years],
-            'Present Value': [present_value if i-2023 == exit_year else 0 for i in years]
-        }
-        
-        df = pd.DataFrame(projection_data)
-        st.dataframe(df, use_container_width=True)
+        with stage('tables'):
+            df, df_investor, cash_flow_dates, investor_xirr = build_projection_tables(
+                valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                discount_rate, equity_stake_entry, dilution_effect, preference
+            )
+        with stage('projection_dataframe'):
+            st.dataframe(df, use_container_width=True, column_config=projection_column_config(currency))
         
         # Investor cash flows
         st.markdown('<div class="section-header">💰 Investor Cash Flows</div>', unsafe_allow_html=True)
         
-        investor_data = {
-            'Year': years,
-            'Investment': [-investment_amount if i == 2023 else 0 for i in years],
-            'Exit Proceeds': [exit_proceeds if i-2023 == exit_year else 0 for i in years],
-            'Net Cash Flow': [-investment_amount if i == 2023 else (exit_proceeds if i-2023 == exit_year else 0) for i in years],
-            'Equity Stake': [f"{equity_stake_entry:.1%}" if i-2023 <= exit_year else "" for i in years]
-        }
+        with stage('investor_dataframe'):
+            st.dataframe(df_investor, use_container_width=True, column_config=investor_column_config(currency))
         
-        df_investor = pd.DataFrame(investor_data)
-        st.dataframe(df_investor, use_container_width=True)
-    
-    with col2:
-        # Visualization section
-        st.markdown('<div class="section-header">📊 Visualizations</div>', unsafe_allow_html=True)
+        st.caption(f"XIRR on dated cash flows ({cash_flow_dates[0]:%d-%b-%Y} → {cash_flow_dates[exit_year]:%d-%b-%Y}): {investor_xirr:.2%}")
         
-        # Valuation breakdown pie chart
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=['Enterprise Value', 'Debt', 'Cash'],
-            values=[enterprise_value, financial_debt, cash_balance],
-            hole=0.4,
-            marker_colors=['#3498db', '#e74c3c', '#2ecc71']
-        )])
-        fig_pie.update_layout(
-            title="Valuation Breakdown",
-            height=300,
-            showlegend=True
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
-        
-        # IRR sensitivity analysis
-        irr_range = []
-        discount_rates = np.arange(0.15, 0.35, 0.01)
-        
-        for dr in discount_rates:
-            pv_temp = calculate_present_value(equity_value, dr, exit_year)
-            investment_temp = pv_temp * equity_stake_entry
-            exit_temp = equity_value * equity_stake_exit
-            irr_temp = calculate_irr([-investment_temp, exit_temp])
-            irr_range.append(irr_temp)
-        
-        fig_sensitivity = go.Figure()
-        fig_sensitivity.add_trace(go.Scatter(
-            x=discount_rates * 100,
-            y=np.array(irr_range) * 100,
-            mode='lines+markers',
-            name='IRR',
-            line=dict(color='#3498db', width=3)
-        ))
-        fig_sensitivity.update_layout(
-            title="IRR Sensitivity to Discount Rate",
-            xaxis_title="Discount Rate (%)",
-            yaxis_title="IRR (%)",
-            height=300
-        )
-        st.plotly_chart(fig_sensitivity, use_container_width=True)
+        # Ownership path through the modelled rounds
+        if use_cap_table and len(rounds):
+            with st.expander("🧮 Cap Table"):
+                ownership = ownership_paths(equity_stake_entry, *round_inputs, pool_in_pre_money=pool_in_pre_money)
+                st.dataframe(
+                    pd.DataFrame({
+                        'Round': ['Entry'] + list(rounds['Round']),
+                        'Pre-Money': np.concatenate([[np.nan], round_inputs[0]]),
+                        'New Money': np.concatenate([[np.nan], round_inputs[1]]),
+                        'Investor Ownership': ownership
+                    }),
+                    use_container_width=True,
+                    column_config={
+                        'Pre-Money': money_column('Pre-Money', currency),
+                        'New Money': money_column('New Money', currency),
+                        'Investor Ownership': st.column_config.NumberColumn(format="percent")
+                    }
+                )
         
-        # Multiple scenarios comparison
-        st.subheader("Quick Scenario Analysis")
+        # Investor payoff across exit values under the preference terms
+        if preference is not None:
+            with st.expander("🌊 Exit Waterfall"):
+                with stage('waterfall_figure'):
+                    fig_waterfall = build_waterfall_figure(equity_value, equity_stake_exit, investment_amount,
+                                                           preference)
+                with stage('waterfall_chart'):
+                    st.plotly_chart(fig_waterfall, use_container_width=True)
         
-        scenarios = {
-            'Conservative': {'multiple': ev_revenue_multiple * 0.7, 'revenue': exit_revenue * 0.8},
-            'Base Case': {'multiple': ev_revenue_multiple, 'revenue': exit_revenue},
-            'Optimistic': {'multiple': ev_revenue_multiple * 1.3, 'revenue': exit_revenue * 1.2}
-        }
+        # Solve the model backwards for a target return
+        goal_seek_panel(investment_amount, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                        discount_rate, equity_stake_entry, dilution_effect, preference, currency)
         
-        scenario_results = []
-        for scenario_name, params in scenarios.items():
-            ev_scenario = params['revenue'] * params['multiple']
-            equity_scenario = ev_scenario - financial_debt + cash_balance
-            pv_scenario = calculate_present_value(equity_scenario, discount_rate, exit_year)
-            investment_scenario = pv_scenario * equity_stake_entry
-            exit_scenario = equity_scenario * equity_stake_exit
-            irr_scenario = calculate_irr([-investment_scenario, exit_scenario])
-            
-            scenario_results.append({
-                'Scenario': scenario_name,
-                'IRR': f"{irr_scenario:.1%}",
-                'Multiple': f"{exit_scenario/investment_scenario:.1f}x",
-                'Investment': f"{currency} {investment_scenario:,.0f}"
-            })
+        # Monte Carlo mode: uncertain exit, investment priced off the base case
+        monte_carlo_panel(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, exit_year,
+                          equity_stake_entry, dilution_effect, investment_amount, preference)
+    
+    # Fragments rerun on their own when only their widgets change
+    with col2:
+        # Visualization section
+        visualization_panel(enterprise_value, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                            discount_rate, exit_year, equity_stake_entry, dilution_effect, preference)
         
-        df_scenarios = pd.DataFrame(scenario_results)
-        st.dataframe(df_scenarios, use_container_width=True)
+        # Scenario edits rerun the whole page, so the exports pick up the new set
+        scenarios = scenario_panel(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance, discount_rate,
+                                   exit_year, equity_stake_entry, dilution_effect, preference, currency)
     
     # Export functionality
-    st.markdown('<div class="section-header">📁 Export Results</div>', unsafe_allow_html=True)
-    
-    col_export1, col_export2 = st.columns(2)
-    
-    with col_export1:
-        if st.button("📊 Export to Excel", type="primary"):
-            # Create Excel file in memory
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Projections', index=False)
-                df_investor.to_excel(writer, sheet_name='Investor_Flows', index=False)
-                df_scenarios.to_excel(writer, sheet_name='Scenarios', index=False)
-            
-            st.download_button(
-                label="Download Excel File",
-                data=output.getvalue(),
-                file_name=f"VC_Valuation_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+    export_panel(valuation_date, exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                 discount_rate, equity_stake_entry, dilution_effect, preference, scenarios, currency, equity_value,
+                 present_value, investor_irr, cash_on_cash_multiple, investment_amount)
     
-    with col_export2:
-        if st.button("📈 Generate Report", type="secondary"):
-            report = f"""
-            # VC Valuation Report
-            
-            **Valuation Date:** {valuation_date}
-            **Exit Year:** Year {exit_year}
-            **Currency:** {currency}
-            
-            ## Key Metrics
-            - **Company Equity Value:** {currency} {equity_value:,.0f}
-            - **Present Value:** {currency} {present_value:,.0f}
-            - **Investor IRR:** {investor_irr:.1%}
-            - **Cash Multiple:** {cash_on_cash_multiple:.1f}x
-            - **Investment Required:** {currency} {investment_amount:,.0f}
-            
-            ## Assumptions
-            - **Exit Revenue:** {currency} {exit_revenue:,.0f}
-            - **EV/Revenue Multiple:** {ev_revenue_multiple:.1f}x
-            - **Discount Rate:** {discount_rate:.1%}
-            - **Equity Stake:** {equity_stake_entry:.1%}
-            """
-            
-            st.download_button(
-                label="Download Report (Markdown)",
-                data=report,
-                file_name=f"VC_Report_{datetime.now().strftime('%Y%m%d')}.md",
-                mime="text/markdown"
-            )
+    # Hidden performance panel, opened with ?perf=1
+    if st.query_params.get('perf') == '1':
+        performance_panel()
 
 if __name__ == "__main__":
     main()
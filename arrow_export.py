@@ -0,0 +1,84 @@
+"""Columnar Parquet / Arrow IPC export of valuation results.
+
+Tables are built straight from NumPy arrays (or numeric DataFrames) and
+written chunk by chunk, so large grids and simulation outputs go to disk
+without string formatting or a full in-memory copy.
+"""
+import io
+import zipfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+FORMATS = {'parquet': '.parquet', 'ipc': '.arrow'}
+
+
+def to_arrow_table(columns):
+    """Arrow table from a dict of 1-D arrays or a DataFrame, zero-copy where possible"""
+    if hasattr(columns, 'to_numpy') and hasattr(columns, 'columns'):
+        return pa.Table.from_pandas(columns, preserve_index=False)
+    return pa.table({name: pa.array(np.asarray(values)) for name, values in columns.items()})
+
+
+class ColumnarWriter:
+    """Incremental writer of column chunks to one Parquet or Arrow IPC file.
+
+    sink is a path or binary file object. The schema is taken from the
+    first chunk and later chunks are cast to it.
+    """
+
+    def __init__(self, sink, format='parquet', compression='zstd'):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown columnar format: {format}")
+        self.sink = sink
+        self.format = format
+        self.compression = None if compression in (None, 'none') else compression
+        self.writer = None
+        self.schema = None
+        self.n_rows = 0
+
+    def write(self, chunk):
+        """Append a dict of arrays or a DataFrame"""
+        table = to_arrow_table(chunk)
+        if self.writer is None:
+            self.schema = table.schema
+            if self.format == 'parquet':
+                self.writer = pq.ParquetWriter(self.sink, self.schema, compression=self.compression or 'none')
+            else:
+                options = ipc.IpcWriteOptions(compression=self.compression)
+                self.writer = ipc.new_file(self.sink, self.schema, options=options)
+        self.writer.write_table(table.cast(self.schema))
+        self.n_rows += table.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def write_table_chunks(sink, chunks, format='parquet', compression='zstd'):
+    """Stream an iterable of column chunks to one file; returns the rows written"""
+    writer = ColumnarWriter(sink, format, compression)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    finally:
+        writer.close()
+    return writer.n_rows
+
+
+def export_tables(tables, format='parquet', compression='zstd'):
+    """Zip archive bytes holding one columnar file per table.
+
+    tables maps a table name to either a single table (dict of arrays or
+    DataFrame) or an iterable of chunks, e.g. sensitivity.iter_grid_rows.
+    """
+    output = io.BytesIO()
+    # Members are already compressed column by column
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, table in tables.items():
+            chunks = [table] if isinstance(table, dict) or hasattr(table, 'columns') else table
+            with archive.open(name + FORMATS[format], 'w') as member:
+                write_table_chunks(member, chunks, format, compression)
+    return output.getvalue()
@@ -0,0 +1,147 @@
+"""Headless batch valuation of a deal portfolio from CSV or Parquet.
+
+Usage:
+    python batch_valuation.py deals.csv -o results.parquet
+
+Every row carries the same inputs as the app sidebar (rates and stakes as
+fractions, e.g. 0.25 for 25%). Rows are valued chunk by chunk in one
+vectorized pass per chunk and streamed to the output file (CSV, Parquet,
+Arrow IPC or a constant-memory .xlsx workbook).
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from arrow_export import ColumnarWriter
+from excel_stream import StreamingExcelWriter
+from valuation_core import cash_flow_schedule, value_deals
+
+REQUIRED_COLUMNS = ('exit_year', 'exit_revenue', 'ev_revenue_multiple', 'discount_rate', 'equity_stake_entry')
+OPTIONAL_COLUMNS = {'financial_debt': 0.0, 'cash_balance': 0.0, 'dilution_effect': 0.0}
+
+
+def deal_inputs(deals):
+    """Valuation inputs of a DataFrame of deals as float arrays"""
+    missing = [name for name in REQUIRED_COLUMNS if name not in deals.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    inputs = {name: deals[name].to_numpy(dtype=float) for name in REQUIRED_COLUMNS}
+    for name, default in OPTIONAL_COLUMNS.items():
+        inputs[name] = deals[name].to_numpy(dtype=float) if name in deals.columns else np.full(len(deals), default)
+    return inputs
+
+
+def value_frame(deals):
+    """Append the valuation outputs to a DataFrame of deals"""
+    results = value_deals(**deal_inputs(deals))
+    return deals.assign(**results)
+
+
+def schedule_frame(deals):
+    """Long-format yearly cash-flow schedule of a DataFrame of deals, keyed by deal_id"""
+    schedule = cash_flow_schedule(**deal_inputs(deals))
+    # Key rows by the file's own deal_id when it has one
+    deal_ids = deals['deal_id'].to_numpy() if 'deal_id' in deals.columns else deals.index.to_numpy()
+    schedule['deal_id'] = deal_ids[schedule['deal_id']]
+    return pd.DataFrame(schedule)
+
+
+def _is_parquet(path):
+    return str(path).lower().endswith(('.parquet', '.pq'))
+
+
+def _is_arrow_ipc(path):
+    return str(path).lower().endswith(('.arrow', '.feather', '.ipc'))
+
+
+def read_chunks(path, chunk_size):
+    """Yield DataFrames of at most chunk_size deals from a CSV or Parquet file"""
+    if _is_parquet(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, frame):
+        # Arrow's CSV writer is an order of magnitude faster than to_csv
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.schema = table.schema
+            self.writer = pa_csv.CSVWriter(self.path, self.schema)
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class _ExcelSink:
+    def __init__(self, path):
+        self.writer = StreamingExcelWriter(path)
+        self.started = False
+
+    def write(self, frame):
+        if not self.started:
+            self.writer.add_sheet('Valuations', frame.columns)
+            self.started = True
+        self.writer.write_chunk(frame)
+
+    def close(self):
+        self.writer.close()
+
+
+def run(input_path, output_path, chunk_size=100_000, compression='zstd', cash_flows=False):
+    """Value every deal in input_path and stream the results to output_path.
+
+    With cash_flows=True the output is the yearly cash-flow schedule of
+    every deal (long format, keyed by deal_id) instead of one row per deal.
+    """
+    transform = schedule_frame if cash_flows else value_frame
+    if _is_parquet(output_path) or _is_arrow_ipc(output_path):
+        sink = ColumnarWriter(output_path, 'parquet' if _is_parquet(output_path) else 'ipc', compression)
+    elif str(output_path).lower().endswith('.xlsx'):
+        sink = _ExcelSink(output_path)
+    else:
+        sink = _CsvSink(output_path)
+
+    n_deals = 0
+    try:
+        for chunk in read_chunks(input_path, chunk_size):
+            sink.write(transform(chunk))
+            n_deals += len(chunk)
+    finally:
+        sink.close()
+    return n_deals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Value a portfolio of VC deals from CSV or Parquet.")
+    parser.add_argument("input", help="CSV or Parquet file with one deal per row")
+    parser.add_argument("-o", "--output", required=True, help="CSV, Parquet, Arrow IPC (.arrow) or .xlsx file for the results")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="deals valued per chunk (default: 100000)")
+    parser.add_argument("--compression", default="zstd", help="Parquet/Arrow compression codec (default: zstd)")
+    parser.add_argument("--cash-flows", action="store_true",
+                        help="write each deal's yearly cash-flow schedule instead of one summary row per deal")
+    args = parser.parse_args(argv)
+
+    try:
+        n_deals = run(args.input, args.output, args.chunk_size, args.compression, args.cash_flows)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"Valued {n_deals:,} deals -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
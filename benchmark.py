@@ -0,0 +1,357 @@
+"""Benchmarks of the valuation core, the exports and the app rerun path.
+
+Usage:
+    python benchmark.py -o results.json                      # run everything
+    python benchmark.py --sizes 1 1000 -k irr -o quick.json  # subset
+    python benchmark.py --baseline baseline.json -o new.json # compare, exit 1 on regression
+
+Every case is timed at each deal count it supports (1, 1k and 1M by
+default) on inputs drawn from a fixed seed. A case is run in loops long
+enough to last --min-time, the loop is repeated --repeat times, and the
+median per-call time is what gets compared against a baseline. UI cases
+call the app's functions without their Streamlit cache, so they measure
+the work a cache miss costs.
+"""
+import argparse
+import inspect
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from irr import irr_batch
+from sensitivity import sensitivity_grid
+from valuation_core import calculate_irr, calculate_present_value, cash_flow_schedule, value_deals
+
+SIZES = (1, 1_000, 1_000_000)
+EXIT_YEARS = 7
+
+_cases = {}
+
+
+def case(name, sizes=SIZES):
+    """Register setup(n) -> zero-argument callable as a benchmark case"""
+    def register(setup):
+        _cases[name] = (setup, sizes)
+        return setup
+    return register
+
+
+def sample_deals(n, seed=0):
+    """n deals with realistic inputs, identical on every run"""
+    rng = np.random.default_rng(seed)
+    return {
+        'exit_year': rng.integers(3, 11, n).astype(float),
+        'exit_revenue': rng.lognormal(np.log(10e6), 0.8, n),
+        'ev_revenue_multiple': rng.uniform(2, 15, n),
+        'financial_debt': rng.uniform(0, 2e6, n),
+        'cash_balance': rng.uniform(0, 2e6, n),
+        'discount_rate': rng.uniform(0.15, 0.45, n),
+        'equity_stake_entry': rng.uniform(0.05, 0.30, n),
+        'dilution_effect': rng.uniform(0, 0.4, n)
+    }
+
+
+def cash_flow_shapes(n, shape, seed=0):
+    """n rows of yearly investor cash flows of the given shape"""
+    rng = np.random.default_rng(seed)
+    flows = np.zeros((n, EXIT_YEARS + 1))
+    flows[:, 0] = -rng.uniform(1e6, 5e6, n)
+    flows[:, -1] = -flows[:, 0] * rng.uniform(0.5, 6, n)
+    if shape == 'dividends':
+        flows[:, 1:-1] = -flows[:, [0]] * rng.uniform(0, 0.1, (n, EXIT_YEARS - 1))
+    elif shape == 'capital_calls':
+        # Follow-on calls and partial exits: several sign changes
+        flows[:, 1:-1] = -flows[:, [0]] * rng.uniform(-0.4, 0.3, (n, EXIT_YEARS - 1))
+    return flows
+
+
+def uncached(function):
+    """The function beneath Streamlit's cache (and any other decorators)"""
+    return inspect.unwrap(function)
+
+
+def quiet_streamlit():
+    """Silence bare-mode warnings and the per-rerun timing log while benchmarking"""
+    import logging
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    logging.getLogger('vc_valuation.perf').setLevel(logging.WARNING)
+
+
+def load_app():
+    """Import the Streamlit app as a module without running the page"""
+    import logging
+    # Decorating the cached stages outside a runtime warns once per stage
+    logging.disable(logging.WARNING)
+    try:
+        import app
+    finally:
+        logging.disable(logging.NOTSET)
+    quiet_streamlit()
+    return app
+
+
+@case('present_value')
+def bench_present_value(n):
+    deals = sample_deals(n)
+    equity = deals['exit_revenue'] * deals['ev_revenue_multiple']
+    return lambda: calculate_present_value(equity, deals['discount_rate'], deals['exit_year'])
+
+
+for _shape in ('single_exit', 'dividends', 'capital_calls'):
+    @case(f'irr_{_shape}')
+    def bench_irr(n, shape=_shape):
+        flows = cash_flow_shapes(n, shape)
+        if n == 1:
+            # The scalar entry point the app calls
+            return lambda: calculate_irr(list(flows[0]))
+        return lambda: irr_batch(flows)
+
+
+@case('value_deals')
+def bench_value_deals(n):
+    deals = sample_deals(n)
+    return lambda: value_deals(**deals)
+
+
+@case('sensitivity_grid')
+def bench_sensitivity_grid(n):
+    # Square discount rate x multiple grid with about n cells
+    side = max(int(round(np.sqrt(n))), 1)
+    discount_rates = np.linspace(0.05, 0.50, side)
+    multiples = np.linspace(5, 15, side)
+    return lambda: sensitivity_grid(10e6, multiples, 0.0, 0.0, discount_rates, EXIT_YEARS, 0.1, 0.2)
+
+
+@case('scenarios')
+def bench_scenarios(n):
+    # Conservative / base / optimistic cases of n deals in one pass
+    deals = sample_deals(n)
+    factors = np.array([[0.8, 0.7], [1.0, 1.0], [1.2, 1.3]])
+    inputs = {name: values[:, None] for name, values in deals.items()}
+    inputs['exit_revenue'] = inputs['exit_revenue'] * factors[:, 0]
+    inputs['ev_revenue_multiple'] = inputs['ev_revenue_multiple'] * factors[:, 1]
+    return lambda: value_deals(**inputs)
+
+
+@case('scenario_set', sizes=(1, 1_000))
+def bench_scenario_set(n):
+    # n named scenarios overriding the revenue, multiple and exit year of one deal
+    from scenarios import evaluate_scenarios
+    rng = np.random.default_rng(0)
+    base = {name: values[0] for name, values in sample_deals(1).items()}
+    scenarios = [{'name': f"Scenario {i}", 'weight': weight,
+                  'overrides': {'exit_revenue': ('factor', revenue), 'ev_revenue_multiple': ('factor', multiple),
+                                'exit_year': ('absolute', year)}}
+                 for i, (weight, revenue, multiple, year) in enumerate(zip(
+                     rng.uniform(0, 1, n), rng.uniform(0.5, 1.5, n), rng.uniform(0.5, 1.5, n),
+                     rng.integers(3, 11, n).astype(float)))]
+    return lambda: evaluate_scenarios(base, scenarios)
+
+
+@case('cash_flow_schedule')
+def bench_cash_flow_schedule(n):
+    deals = sample_deals(n)
+    return lambda: cash_flow_schedule(**deals)
+
+
+@case('schedule_dataframe')
+def bench_schedule_dataframe(n):
+    import pandas as pd
+    schedule = cash_flow_schedule(**sample_deals(n))
+    return lambda: pd.DataFrame(schedule)
+
+
+@case('excel_export')
+def bench_excel_export(n):
+    from excel_stream import write_excel
+    results = value_deals(**sample_deals(n))
+    chunk_size = 100_000
+
+    def export():
+        chunks = ({name: values[start:start + chunk_size] for name, values in results.items()}
+                  for start in range(0, n, chunk_size))
+        write_excel(io.BytesIO(), {'Valuations': (list(results), chunks)})
+    return export
+
+
+@case('parquet_export')
+def bench_parquet_export(n):
+    from arrow_export import export_tables
+    results = value_deals(**sample_deals(n))
+    return lambda: export_tables({'valuations': results})
+
+
+def _app_inputs():
+    from datetime import date
+    return dict(valuation_date=date(2025, 1, 1), exit_year=EXIT_YEARS, exit_revenue=10e6, ev_revenue_multiple=10.0,
+                financial_debt=0.0, cash_balance=0.0, discount_rate=0.25, equity_stake_entry=0.1,
+                dilution_effect=0.2)
+
+
+@case('app_scenarios', sizes=(1,))
+def bench_app_scenarios(n):
+    app = load_app()
+    inputs = _app_inputs()
+    return lambda: uncached(app.compute_scenarios)(
+        inputs['exit_revenue'], inputs['ev_revenue_multiple'], inputs['financial_debt'], inputs['cash_balance'],
+        inputs['discount_rate'], inputs['exit_year'], inputs['equity_stake_entry'], inputs['dilution_effect'],
+        app.DEFAULT_SCENARIOS)
+
+
+@case('app_projection_tables', sizes=(1,))
+def bench_app_projection_tables(n):
+    app = load_app()
+    return lambda: uncached(app.build_projection_tables)(**_app_inputs())
+
+
+@case('app_figures', sizes=(1,))
+def bench_app_figures(n):
+    app = load_app()
+    inputs = _app_inputs()
+    grid_args = (inputs['exit_revenue'], inputs['ev_revenue_multiple'], inputs['financial_debt'],
+                 inputs['cash_balance'], inputs['exit_year'], inputs['equity_stake_entry'], inputs['dilution_effect'])
+
+    def figures():
+        uncached(app.build_pie_figure)(100e6, 0.0, 0.0)
+        uncached(app.build_sensitivity_figure)(*grid_args)
+        uncached(app.build_heatmap_figure)(*grid_args, 'IRR')
+    return figures
+
+
+@case('app_excel_export', sizes=(1,))
+def bench_app_excel_export(n):
+    app = load_app()
+    return lambda: uncached(app.build_excel_export)(**_app_inputs(), preference=None)
+
+
+@case('app_markdown_report', sizes=(1,))
+def bench_app_markdown_report(n):
+    app = load_app()
+    inputs = _app_inputs()
+    return lambda: app.valuation_report(inputs['valuation_date'], inputs['exit_year'], 'USD', inputs['exit_revenue'],
+                                        inputs['ev_revenue_multiple'], inputs['discount_rate'],
+                                        inputs['equity_stake_entry'], 100e6, 20e6, 0.2, 3.5, 2e6)
+
+
+@case('app_rerun', sizes=(1,))
+def bench_app_rerun(n):
+    from streamlit.testing.v1 import AppTest
+    quiet_streamlit()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    return lambda: AppTest.from_file(script, default_timeout=120).run()
+
+
+def measure(function, repeat=5, min_time=0.2):
+    """Median, min and max seconds per call over `repeat` timed loops"""
+    start = time.perf_counter()
+    function()  # warm-up, also sizes the loop
+    first = time.perf_counter() - start
+    loops = max(1, int(np.ceil(min_time / max(first, 1e-9))))
+    if first > 5 * min_time:
+        repeat = min(repeat, 3)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        timings.append((time.perf_counter() - start) / loops)
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'max_s': max(timings),
+        'loops': loops,
+        'repeat': repeat
+    }
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run(sizes=SIZES, keyword=None, repeat=5, min_time=0.2, log=sys.stderr):
+    """Results keyed 'case[n]', in registration then size order"""
+    results = {}
+    for name, (setup, case_sizes) in _cases.items():
+        if keyword and keyword not in name:
+            continue
+        for n in case_sizes:
+            if n not in sizes:
+                continue
+            key = f"{name}[{n}]"
+            try:
+                results[key] = {'case': name, 'n': n, **measure(setup(n), repeat, min_time)}
+            except ImportError as error:
+                results[key] = {'case': name, 'n': n, 'skipped': str(error)}
+            if log:
+                result = results[key]
+                timing = result.get('skipped') or f"{result['median_s'] * 1000:12.3f} ms"
+                print(f"{key:<36}{timing}", file=log)
+    return results
+
+
+def compare(results, baseline, threshold=0.1):
+    """Rows of (key, baseline s, current s, change) and the keys slower than threshold"""
+    rows, regressions = [], []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous or 'median_s' not in previous or 'median_s' not in result:
+            continue
+        change = result['median_s'] / previous['median_s'] - 1
+        rows.append((key, previous['median_s'], result['median_s'], change))
+        if change > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the valuation core, exports and app rerun path.")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="deal counts (default: 1 1000 1000000)")
+    parser.add_argument("-k", "--keyword", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="timed loops per case (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed loop (default: 0.2)")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown that counts as a regression (default: 0.1)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (_, sizes) in _cases.items():
+            print(f"{name:<28}{', '.join(f'{n:,}' for n in sizes)}")
+        return 0
+
+    results = run(args.sizes, args.keyword, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'environment': environment(), 'results': results}, file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        rows, regressions = compare(results, baseline, args.threshold)
+        print(f"\n{'case':<36}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+        for key, previous, current, change in rows:
+            flag = "  <-- regression" if key in regressions else ""
+            print(f"{key:<36}{previous * 1000:14.3f}{current * 1000:14.3f}{change:+10.1%}{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
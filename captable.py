@@ -0,0 +1,48 @@
+"""Multi-round cap table and dilution engine.
+
+Future financing rounds are described by rounds x scenarios arrays of
+pre-money valuation, new money and option pool top-up. Ownership paths are
+cumulative products over the round axis, so thousands of round structures
+are evaluated in one pass; the resulting total dilution plugs straight into
+the dilution_effect input of the valuation pipeline.
+"""
+import numpy as np
+
+
+def round_retention(pre_money, new_money, option_pool=0.0, pool_in_pre_money=True):
+    """Fraction of their stake existing holders keep through each round.
+
+    new_money buys new_money / (pre_money + new_money) of the post-money.
+    option_pool is the top-up granted in the round as a fraction of the
+    post-money; in a pre-money pool (the usual term sheet "option pool
+    shuffle") it comes entirely out of the existing holders, otherwise it
+    dilutes the new investors as well.
+    """
+    pre_money = np.asarray(pre_money, dtype=float)
+    new_money = np.asarray(new_money, dtype=float)
+    option_pool = np.asarray(option_pool, dtype=float)
+    pre_money_share = pre_money / (pre_money + new_money)
+    if pool_in_pre_money:
+        retention = pre_money_share - option_pool
+    else:
+        retention = pre_money_share * (1 - option_pool)
+    return np.clip(retention, 0.0, 1.0)
+
+
+def ownership_paths(equity_stake_entry, pre_money, new_money, option_pool=0.0, pool_in_pre_money=True):
+    """Investor ownership after each round, rounds on axis 0.
+
+    Inputs broadcast to (n_rounds, ...) with any trailing scenario axes.
+    Row 0 of the result is the entry stake, row k the stake after round k
+    and the last row the stake at exit.
+    """
+    retention = np.atleast_1d(round_retention(pre_money, new_money, option_pool, pool_in_pre_money))
+    cumulative = np.cumprod(retention, axis=0)
+    entry = np.broadcast_to(np.asarray(equity_stake_entry, dtype=float), cumulative.shape[1:])
+    return np.concatenate([entry[None], entry * cumulative], axis=0)
+
+
+def dilution_from_rounds(pre_money, new_money, option_pool=0.0, pool_in_pre_money=True):
+    """Total dilution across all rounds, in the same units as dilution_effect"""
+    retention = np.atleast_1d(round_retention(pre_money, new_money, option_pool, pool_in_pre_money))
+    return 1 - np.prod(retention, axis=0)
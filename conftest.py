@@ -0,0 +1 @@
+"""Pytest configuration: the flat modules at the repository root are importable from tests/"""
@@ -0,0 +1,124 @@
+"""Closed-form sensitivities of the valuation outputs to every input.
+
+The VC method pipeline is a short chain of products and powers, so every
+partial derivative has an exact closed form:
+
+    E   = R * m - D + C                    equity value at exit
+    PV  = E / (1 + r) ** T
+    I   = PV * s                           investment
+    X   = E * s * (1 - d)                  exit proceeds
+    M   = X / I = (1 + r) ** T * (1 - d)   cash multiple
+    IRR = (1 + r) * (1 - d) ** (1 / T) - 1
+
+value_gradients evaluates all of them for a batch of deals in the same
+broadcast pass as value_deals, replacing a bump-and-revalue run per input.
+"""
+import numpy as np
+
+from valuation_core import value_deals
+
+GRADIENT_INPUTS = (
+    'exit_revenue',
+    'ev_revenue_multiple',
+    'financial_debt',
+    'cash_balance',
+    'discount_rate',
+    'exit_year',
+    'equity_stake_entry',
+    'dilution_effect'
+)
+GRADIENT_OUTPUTS = ('present_value', 'investment_amount', 'exit_proceeds', 'investor_irr', 'cash_on_cash_multiple')
+
+
+def value_gradients(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                    discount_rate, equity_stake_entry, dilution_effect):
+    """Outputs of value_deals plus d(output)/d(input) for every pair.
+
+    Returns {'values': value_deals result, 'inputs': broadcast inputs,
+    'gradient': {output: {input: array}}}. The multiple and IRR gradients
+    are NaN where those outputs are undefined (no investment, or no
+    positive exit for the IRR).
+    """
+    inputs = dict(zip(GRADIENT_INPUTS, np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+        discount_rate, exit_year, equity_stake_entry, dilution_effect)))))
+    values = value_deals(**inputs)
+    revenue, multiple, rate, years = (inputs[name] for name in
+                                      ('exit_revenue', 'ev_revenue_multiple', 'discount_rate', 'exit_year'))
+    stake, dilution = inputs['equity_stake_entry'], inputs['dilution_effect']
+    equity, present_value = values['equity_value'], values['present_value']
+    zero = np.zeros_like(equity)
+
+    # Equity value is linear in the four balance-sheet inputs
+    d_equity = {
+        'exit_revenue': multiple,
+        'ev_revenue_multiple': revenue,
+        'financial_debt': -np.ones_like(equity),
+        'cash_balance': np.ones_like(equity)
+    }
+    growth = 1 + rate
+    discount = growth ** -years
+    log_growth = np.log(growth)
+
+    d_present_value = {name: discount * d_equity[name] for name in d_equity}
+    d_present_value.update({
+        'discount_rate': -years * present_value / growth,
+        'exit_year': -present_value * log_growth,
+        'equity_stake_entry': zero,
+        'dilution_effect': zero
+    })
+
+    d_investment = {name: stake * d_present_value[name] for name in GRADIENT_INPUTS}
+    d_investment['equity_stake_entry'] = present_value
+
+    retained = stake * (1 - dilution)
+    d_exit_proceeds = {name: retained * d_equity[name] for name in d_equity}
+    d_exit_proceeds.update({
+        'discount_rate': zero,
+        'exit_year': zero,
+        'equity_stake_entry': (1 - dilution) * equity,
+        'dilution_effect': -stake * equity
+    })
+
+    # The multiple and IRR depend on r, T and d only
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cash_multiple = growth ** years * (1 - dilution)
+        d_multiple = {name: zero for name in GRADIENT_INPUTS}
+        d_multiple.update({
+            'discount_rate': years * cash_multiple / growth,
+            'exit_year': cash_multiple * log_growth,
+            'dilution_effect': -growth ** years
+        })
+        retention_rate = (1 - dilution) ** (1 / years)
+        d_irr = {name: zero for name in GRADIENT_INPUTS}
+        d_irr.update({
+            'discount_rate': retention_rate,
+            'exit_year': -growth * retention_rate * np.log(1 - dilution) / years ** 2,
+            'dilution_effect': -growth * retention_rate / ((1 - dilution) * years)
+        })
+
+    has_multiple = values['investment_amount'] > 0
+    has_irr = np.isfinite(values['investor_irr'])
+    return {
+        'values': values,
+        'inputs': inputs,
+        'gradient': {
+            'present_value': d_present_value,
+            'investment_amount': d_investment,
+            'exit_proceeds': d_exit_proceeds,
+            'investor_irr': {name: np.where(has_irr, d_irr[name], np.nan) for name in GRADIENT_INPUTS},
+            'cash_on_cash_multiple': {name: np.where(has_multiple, d_multiple[name], np.nan)
+                                      for name in GRADIENT_INPUTS}
+        }
+    }
+
+
+def elasticities(result):
+    """d ln(output) / d ln(input): % change in each output per 1% change in each input"""
+    elasticity = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for output in GRADIENT_OUTPUTS:
+            value = result['values'][output]
+            elasticity[output] = {name: result['gradient'][output][name] * result['inputs'][name] / value
+                                  for name in GRADIENT_INPUTS}
+    return elasticity
@@ -0,0 +1,91 @@
+"""Constant-memory Excel export for large result sets.
+
+Rows are appended chunk by chunk to an openpyxl write-only workbook, which
+streams each sheet to a temporary file instead of keeping cell objects in
+memory, so peak memory depends on the chunk size and not the row count.
+"""
+import numpy as np
+
+# Excel's hard limit, header row included
+MAX_SHEET_ROWS = 1_048_576
+
+
+def _column_values(values):
+    """Python values for one column; NaN becomes an empty cell"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        missing = np.isnan(values)
+        if missing.any():
+            values = np.where(missing, None, values.astype(object))
+    elif values.dtype.kind == 'M':
+        values = values.astype('datetime64[us]').astype(object)
+    return values.tolist()
+
+
+class StreamingExcelWriter:
+    """Write-only workbook fed with chunks of column arrays.
+
+    Usage:
+        with StreamingExcelWriter(path_or_file) as writer:
+            writer.add_sheet('Results', ['deal_id', 'irr'])
+            for chunk in chunks:
+                writer.write_chunk(chunk)   # dict of arrays or DataFrame
+
+    A sheet that reaches Excel's row limit continues on 'Name_2', 'Name_3'...
+    """
+
+    def __init__(self, file):
+        from openpyxl import Workbook
+        self.file = file
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.columns = None
+        self.name = None
+        self.part = 0
+        self.rows_in_sheet = 0
+
+    def add_sheet(self, name, columns):
+        """Start a new sheet; subsequent chunks are written to it"""
+        self.name = name
+        self.columns = list(columns)
+        self.part = 0
+        self._new_part()
+
+    def _new_part(self):
+        self.part += 1
+        title = self.name if self.part == 1 else f"{self.name}_{self.part}"
+        self.sheet = self.workbook.create_sheet(title=title[:31])
+        self.sheet.append(self.columns)
+        self.rows_in_sheet = 1
+
+    def write_chunk(self, chunk):
+        """Append one chunk: a dict of equal-length arrays or a DataFrame"""
+        rows = zip(*(_column_values(chunk[name]) for name in self.columns))
+        for row in rows:
+            if self.rows_in_sheet >= MAX_SHEET_ROWS:
+                self._new_part()
+            self.sheet.append(row)
+            self.rows_in_sheet += 1
+
+    def close(self):
+        self.workbook.save(self.file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+
+def write_excel(file, sheets):
+    """Stream several sheets to file.
+
+    sheets maps a sheet name to (columns, chunks) where chunks is any
+    iterable (typically a generator) of dicts of arrays or DataFrames.
+    """
+    with StreamingExcelWriter(file) as writer:
+        for name, (columns, chunks) in sheets.items():
+            writer.add_sheet(name, columns)
+            for chunk in chunks:
+                writer.write_chunk(chunk)
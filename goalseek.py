@@ -0,0 +1,168 @@
+"""Goal seek: the input value that makes a deal hit a target IRR or cash multiple.
+
+The investor writes a cheque of investment_amount for equity_stake_entry
+of the company and receives its diluted stake of the exit equity value
+(through the liquidation-preference waterfall when preference terms are
+given). A target IRR g over T years is the same as a target multiple
+(1 + g) ** T, and with pro-rata proceeds
+
+    investment_amount * multiple = equity_value * stake * (1 - dilution)
+
+inverts in closed form for the stake, the pre-money valuation, the
+EV/Revenue multiple or the exit revenue. With preference terms the payoff
+is piecewise linear, so every deal is solved by a vectorized bisection
+bracketed by the pro-rata answer. Every argument broadcasts, so one call
+solves a whole portfolio of deals and targets.
+
+break_even_surface applies the same inversion over an exit year x
+discount rate grid, with the discount rate as the target IRR.
+"""
+import numpy as np
+
+from valuation_core import calculate_present_value, enterprise_value, equity_stake_exit, equity_value
+from waterfall import investor_payoff
+
+GOAL_VARIABLES = ('equity_stake_entry', 'pre_money', 'ev_revenue_multiple', 'exit_revenue')
+
+
+def required_multiple(exit_year, target_irr=None, target_multiple=None):
+    """Cash multiple implied by a target IRR (or the target multiple itself)"""
+    if (target_irr is None) == (target_multiple is None):
+        raise ValueError("Give exactly one of target_irr and target_multiple")
+    if target_multiple is not None:
+        return np.asarray(target_multiple, dtype=float)
+    return (1 + np.asarray(target_irr, dtype=float)) ** np.asarray(exit_year, dtype=float)
+
+
+def _closed_form(solve_for, required_proceeds, investment_amount, exit_revenue, ev_revenue_multiple,
+                 financial_debt, cash_balance, equity_stake_entry, dilution_effect):
+    """Pro-rata solution of exit proceeds == required_proceeds"""
+    retention = 1 - dilution_effect
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if solve_for in ('equity_stake_entry', 'pre_money'):
+            equity = equity_value(enterprise_value(exit_revenue, ev_revenue_multiple), financial_debt, cash_balance)
+            stake = required_proceeds / (equity * retention)
+            if solve_for == 'equity_stake_entry':
+                return stake
+            return investment_amount / stake - investment_amount
+        # Exit equity the stake has to be applied to
+        equity = required_proceeds / (equity_stake_exit(equity_stake_entry, dilution_effect))
+        if solve_for == 'ev_revenue_multiple':
+            return (equity + financial_debt - cash_balance) / exit_revenue
+        return (equity + financial_debt - cash_balance) / ev_revenue_multiple
+
+
+def _proceeds(solve_for, value, investment_amount, exit_revenue, ev_revenue_multiple, financial_debt,
+              cash_balance, equity_stake_entry, dilution_effect, preference):
+    """Investor exit proceeds with value substituted for the solved-for input"""
+    if solve_for == 'equity_stake_entry':
+        equity_stake_entry = value
+    elif solve_for == 'pre_money':
+        equity_stake_entry = investment_amount / (value + investment_amount)
+    elif solve_for == 'ev_revenue_multiple':
+        ev_revenue_multiple = value
+    else:
+        exit_revenue = value
+    equity = equity_value(enterprise_value(exit_revenue, ev_revenue_multiple), financial_debt, cash_balance)
+    return investor_payoff(equity, equity_stake_exit(equity_stake_entry, dilution_effect), investment_amount,
+                           *preference)
+
+
+def goal_seek(solve_for, investment_amount, exit_year, exit_revenue, ev_revenue_multiple, financial_debt=0.0,
+              cash_balance=0.0, equity_stake_entry=0.1, dilution_effect=0.0, target_irr=None,
+              target_multiple=None, preference=None, tol=1e-10, max_iter=200):
+    """Value of solve_for (one of GOAL_VARIABLES) that hits the target, per deal.
+
+    The input being solved for is ignored; the others broadcast against
+    each other and the target. preference is None for pro-rata proceeds or
+    (multiple, participating, cap) as in waterfall.investor_payoff. Deals
+    that cannot reach the target (a stake above 100%, a negative valuation
+    or an unreachable multiple) come back as NaN; a pre-money of inf means
+    the preference alone pays the target at any valuation.
+    """
+    if solve_for not in GOAL_VARIABLES:
+        raise ValueError(f"Cannot solve for {solve_for}; choose one of {', '.join(GOAL_VARIABLES)}")
+    inputs = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        investment_amount, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+        equity_stake_entry, dilution_effect)))
+    required_proceeds = investment_amount * required_multiple(exit_year, target_irr, target_multiple)
+    required_proceeds = np.broadcast_to(required_proceeds, np.broadcast_shapes(required_proceeds.shape,
+                                                                               inputs[0].shape))
+    inputs = [np.broadcast_to(value, required_proceeds.shape) for value in inputs]
+    solution = _closed_form(solve_for, required_proceeds, *inputs)
+
+    if preference is not None:
+        # The preference only ever adds to pro-rata proceeds, so the pro-rata
+        # answer bounds the solution: from above when proceeds rise with the
+        # input, from below for the pre-money (proceeds fall as it grows)
+        def excess(value):
+            return _proceeds(solve_for, value, *inputs, preference) - required_proceeds
+
+        increasing = solve_for != 'pre_money'
+        bound = np.where(np.isfinite(solution), np.maximum(solution, 0.0), np.nan)
+        if increasing:
+            lo, hi = np.zeros_like(bound), bound
+        else:
+            lo, hi = bound, np.maximum(2 * bound, inputs[0])
+            for _ in range(60):
+                # Widen until the proceeds fall below the target
+                widen = excess(hi) >= 0
+                if not widen.any():
+                    break
+                hi = np.where(widen, 2 * hi, hi)
+            # Still at or above target: any valuation works, the preference alone pays the target
+            unbounded = excess(hi) >= 0
+            hi = np.where(unbounded, np.nan, hi)
+        reached = excess(lo) < 0 if increasing else excess(lo) >= 0
+        for _ in range(max_iter):
+            mid = 0.5 * (lo + hi)
+            above = excess(mid) >= 0
+            if increasing:
+                lo, hi = np.where(above, lo, mid), np.where(above, mid, hi)
+            else:
+                lo, hi = np.where(above, mid, lo), np.where(above, hi, mid)
+            if np.all(~np.isfinite(hi - lo) | (hi - lo <= tol * (1 + np.abs(hi)))):
+                break
+        if increasing:
+            # A bound clipped at zero (pro-rata answer negative) never reaches the target
+            solution = np.where(excess(hi) < 0, np.nan, np.where(reached, hi, lo))
+        else:
+            solution = np.where(unbounded, np.inf, np.where(reached, lo, np.nan))
+
+    # Infeasible answers
+    solution = np.where(solution >= 0, solution, np.nan)
+    if solve_for == 'equity_stake_entry':
+        solution = np.where(solution <= 1, solution, np.nan)
+    return solution
+
+
+def break_even_surface(investment_amount, exit_years, discount_rates, exit_revenue, ev_revenue_multiple,
+                       financial_debt=0.0, cash_balance=0.0, equity_stake_entry=0.1, dilution_effect=0.0,
+                       solve_for='ev_revenue_multiple', preference=None):
+    """Minimum EV/Revenue multiple (or exit revenue) that returns the investment at each discount rate.
+
+    Rows are exit_years and columns discount_rates. A cell is the break-even
+    value at which the exit proceeds, discounted at that rate over that many
+    years, are worth exactly the investment -- i.e. the deal earns the rate
+    as its IRR. Returns {'axes': {'exit_year', 'discount_rate'}, solve_for: grid}.
+    """
+    if solve_for not in ('ev_revenue_multiple', 'exit_revenue'):
+        raise ValueError("The break-even surface solves for ev_revenue_multiple or exit_revenue")
+    exit_years = np.asarray(exit_years, dtype=float)
+    discount_rates = np.asarray(discount_rates, dtype=float)
+    if preference is None:
+        # Present value of one unit of exit equity to the investor, in one broadcast
+        pv_per_equity = calculate_present_value(equity_stake_exit(equity_stake_entry, dilution_effect),
+                                                discount_rates[None, :], exit_years[:, None])
+        required_equity = investment_amount / pv_per_equity
+        fixed = exit_revenue if solve_for == 'ev_revenue_multiple' else ev_revenue_multiple
+        surface = (required_equity + financial_debt - cash_balance) / fixed
+        surface = np.where(surface >= 0, surface, np.nan)
+    else:
+        surface = goal_seek(solve_for, investment_amount, exit_years[:, None], exit_revenue, ev_revenue_multiple,
+                            financial_debt, cash_balance, equity_stake_entry, dilution_effect,
+                            target_irr=discount_rates[None, :], preference=preference)
+    return {
+        'axes': {'exit_year': exit_years, 'discount_rate': discount_rates},
+        solve_for: surface
+    }
@@ -0,0 +1,189 @@
+"""Vectorized IRR and XIRR solvers for batches of cash-flow vectors"""
+import numpy as np
+
+# Candidate rates scanned to bracket rows where Newton fails
+_BRACKET_GRID = np.concatenate([
+    np.linspace(-0.99, 0.0, 100, endpoint=False),
+    np.geomspace(1e-4, 1e4, 200)
+])
+
+DAYS_PER_YEAR = 365.0
+
+
+def _npv_rows(cash_flows, times, rates):
+    """NPV of every row of cash_flows at its own rate"""
+    with np.errstate(over='ignore', invalid='ignore'):
+        discount = (1 + rates)[:, None] ** -times
+        return (cash_flows * discount).sum(axis=1)
+
+
+def _bracket_and_bisect(cash_flows, times, tol, max_iter):
+    """Solve rows by scanning for a sign change and bisecting it"""
+    n_rows = cash_flows.shape[0]
+    with np.errstate(over='ignore', invalid='ignore'):
+        grid_discount = (1 + _BRACKET_GRID)[None, :, None] ** -times[:, None, :]
+        npv_grid = (cash_flows[:, None, :] * grid_discount).sum(axis=2)
+
+    sign_change = np.signbit(npv_grid[:, :-1]) != np.signbit(npv_grid[:, 1:])
+    has_bracket = sign_change.any(axis=1)
+    first = sign_change.argmax(axis=1)
+
+    lo = _BRACKET_GRID[first]
+    hi = _BRACKET_GRID[first + 1]
+    npv_lo = npv_grid[np.arange(n_rows), first]
+
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        npv_mid = _npv_rows(cash_flows, times, mid)
+        same_side = np.signbit(npv_mid) == np.signbit(npv_lo)
+        lo = np.where(same_side, mid, lo)
+        npv_lo = np.where(same_side, npv_mid, npv_lo)
+        hi = np.where(same_side, hi, mid)
+        if np.all(hi - lo < tol * (1 + np.abs(lo))):
+            break
+
+    rates = np.where(has_bracket, 0.5 * (lo + hi), np.nan)
+    return rates, has_bracket
+
+
+def _two_flow_rates(cash_flows, times):
+    """Closed-form rate of rows with exactly two flows of opposite sign.
+
+    cf_i * (1 + r) ** -t_i + cf_j * (1 + r) ** -t_j = 0 gives
+    r = (-cf_j / cf_i) ** (1 / (t_j - t_i)) - 1. Returns (mask, rates).
+    """
+    n_rows, n_cols = cash_flows.shape
+    nonzero = cash_flows != 0
+    rows = np.arange(n_rows)
+    first = nonzero.argmax(axis=1)
+    last = n_cols - 1 - nonzero[:, ::-1].argmax(axis=1)
+    entry = cash_flows[rows, first]
+    exit = cash_flows[rows, last]
+    span = times[rows, last] - times[rows, first]
+    two_flows = (nonzero.sum(axis=1) == 2) & (entry * exit < 0) & (span != 0)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        rates = (-exit / entry) ** (1 / span) - 1
+    return two_flows, rates
+
+
+def _solve_rates(cash_flows, times, guess, tol, max_iter):
+    """Solve sum(cf * (1 + r) ** -t) = 0 for every row.
+
+    Single-entry / single-exit rows are answered in closed form; only rows
+    with more flows go through the Newton iterations.
+    """
+    n_rows = cash_flows.shape[0]
+    rates = np.full(n_rows, float(guess))
+    converged = np.zeros(n_rows, dtype=bool)
+
+    # A rate can only exist if the flows change sign
+    solvable = (cash_flows > 0).any(axis=1) & (cash_flows < 0).any(axis=1)
+
+    two_flows, closed_form = _two_flow_rates(cash_flows, times)
+    rates[two_flows] = closed_form[two_flows]
+    converged[two_flows] = np.isfinite(closed_form[two_flows])
+    active = solvable & ~two_flows
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        cf = cash_flows[idx]
+        t = times[idx]
+        r = rates[idx]
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            discount = (1 + r)[:, None] ** -t
+            npv = (cf * discount).sum(axis=1)
+            d_npv = -(t * cf * discount).sum(axis=1) / (1 + r)
+            step = npv / d_npv
+        r_new = r - step
+        # Keep iterates inside the domain r > -1
+        r_new = np.where(r_new <= -1, (r - 1) / 2, r_new)
+
+        failed = ~np.isfinite(r_new)
+        done = ~failed & (np.abs(step) < tol * (1 + np.abs(r)))
+
+        rates[idx] = np.where(failed, rates[idx], r_new)
+        converged[idx[done]] = True
+        active[idx[done | failed]] = False
+
+    # Rows Newton could not settle get a bracketing solve
+    fallback = solvable & ~converged & ~two_flows
+    if fallback.any():
+        idx = np.flatnonzero(fallback)
+        fallback_rates, found = _bracket_and_bisect(cash_flows[idx], times[idx], tol, 200)
+        rates[idx] = fallback_rates
+        converged[idx] = found
+
+    rates[~converged] = np.nan
+    return rates, converged
+
+
+def irr_batch(cash_flows, guess=0.1, tol=1e-10, max_iter=50, full_output=False):
+    """Internal Rate of Return for each row of a 2-D array of cash flows.
+
+    Column t holds the cash flow at the end of period t. Rows with a single
+    entry and a single exit are answered in closed form; the rest are solved
+    together with Newton iterations, and rows that fail to converge fall
+    back to a bracketed bisection. Rows without a sign change have no IRR and return
+    NaN. With full_output=True a (rates, converged) tuple is returned.
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    periods = np.arange(cash_flows.shape[1], dtype=float)
+    times = np.broadcast_to(periods, cash_flows.shape)
+    rates, converged = _solve_rates(cash_flows, times, guess, tol, max_iter)
+    if full_output:
+        return rates, converged
+    return rates
+
+
+def year_fractions(dates, start_date=None):
+    """ACT/365 year fractions of dates measured from start_date.
+
+    dates is a 1-D or 2-D array of dates (anything numpy can cast to
+    datetime64[D]); NaT entries come back as NaN. If start_date is omitted
+    the first date of each row is used.
+    """
+    dates = np.atleast_2d(np.asarray(dates, dtype='datetime64[D]'))
+    if start_date is None:
+        start = dates[:, :1]
+    else:
+        start = np.asarray(start_date, dtype='datetime64[D]').reshape(-1, 1)
+    days = (dates - start).astype(float)
+    days[np.isnat(dates)] = np.nan
+    return days / DAYS_PER_YEAR
+
+
+def _prepare_dated(amounts, dates, start_date):
+    """Align amounts with year fractions; padded (NaT) slots carry no cash"""
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    times = year_fractions(dates, start_date)
+    times = np.broadcast_to(times, amounts.shape).copy()
+    missing = np.isnan(times)
+    amounts = np.where(missing, 0.0, amounts)
+    times[missing] = 0.0
+    return amounts, times
+
+
+def xnpv_batch(rates, amounts, dates, start_date=None):
+    """Net present value of dated cash flows for every row at the given rates"""
+    amounts, times = _prepare_dated(amounts, dates, start_date)
+    rates = np.broadcast_to(np.asarray(rates, dtype=float), amounts.shape[:1])
+    return _npv_rows(amounts, times, rates)
+
+
+def xirr_batch(amounts, dates, start_date=None, guess=0.1, tol=1e-10, max_iter=50,
+               full_output=False):
+    """Annualised IRR of irregular dated cash flows, one deal per row.
+
+    amounts and dates are 2-D arrays of the same shape (or dates is a single
+    row shared by all deals). Deals with fewer flows are padded with NaT
+    dates. Year fractions are precomputed once (ACT/365) and every deal is
+    solved in the same vectorized pass as irr_batch.
+    """
+    amounts, times = _prepare_dated(amounts, dates, start_date)
+    rates, converged = _solve_rates(amounts, times, guess, tol, max_iter)
+    if full_output:
+        return rates, converged
+    return rates
@@ -0,0 +1,179 @@
+"""Headless load test of the app's rerun path.
+
+Usage:
+    python loadtest.py --sessions 1 5 10 20 --interactions 30 --slo-ms 500 -o load.json
+
+Each simulated session is an AppTest instance driven from its own thread:
+one initial page load, then random sidebar and chart interactions, each
+followed by a rerun. Sessions share the process and its caches, as they
+would on one Streamlit server process. AppTest is not thread-safe, so the
+reruns themselves go through one lock; a rerun's latency is measured from
+the interaction, so it includes the time spent queueing behind other
+sessions -- which is what a saturated, GIL-bound server process shows.
+For every session count the report gives throughput, rerun latency
+percentiles and the resident memory added per session; the capacity is
+the largest session count whose p90 latency stays within --slo-ms.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+QUANTILES = (0.5, 0.9, 0.99)
+
+_rerun_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Resident memory of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _widget(widgets, label):
+    """Widget whose label starts with label (labels embed the exit year and currency)"""
+    return next(widget for widget in widgets if widget.label.startswith(label))
+
+
+# Sidebar and chart interactions a session picks from at random
+INTERACTIONS = {
+    'exit_year': lambda at, rng: _widget(at.selectbox, "Exit Year").set_value(rng.randint(1, 10)),
+    'currency': lambda at, rng: _widget(at.selectbox, "Currency").set_value(rng.choice(["USD", "EUR", "GBP"])),
+    'exit_revenue': lambda at, rng: _widget(at.number_input, "Revenue in Year").set_value(rng.randrange(1_000_000, 50_000_000, 100_000)),
+    'ev_revenue_multiple': lambda at, rng: _widget(at.number_input, "EV/Revenue Multiple").set_value(round(rng.uniform(1, 20), 1)),
+    'discount_rate': lambda at, rng: _widget(at.slider, "Required Return").set_value(rng.randrange(10, 100) / 2),
+    'equity_stake_entry': lambda at, rng: _widget(at.slider, "Equity Stake at Entry").set_value(float(rng.randint(1, 50))),
+    'dilution_effect': lambda at, rng: _widget(at.slider, "Dilution Effect").set_value(float(rng.randint(0, 50))),
+    'heatmap_metric': lambda at, rng: _widget(at.radio, "Heatmap Metric").set_value(rng.choice(["Present Value", "Investment", "IRR"]))
+}
+
+
+def run_session(session_id, interactions, think_time, seed, timeout):
+    """Drive one session; returns its rerun latencies, interaction names and errors"""
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(seed * 1_000_003 + session_id)
+    latencies, actions, errors = [], [], []
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    start = time.perf_counter()
+    with _rerun_lock:
+        at.run()
+    latencies.append(time.perf_counter() - start)
+    actions.append('load')
+
+    for _ in range(interactions):
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+        action = rng.choice(list(INTERACTIONS))
+        try:
+            start = time.perf_counter()
+            with _rerun_lock:
+                INTERACTIONS[action](at, rng)
+                at.run()
+            latencies.append(time.perf_counter() - start)
+            actions.append(action)
+            if len(at.exception):
+                errors.append(f"{action}: {at.exception[0].value}")
+        except Exception as error:  # keep the session going, count the failure
+            errors.append(f"{action}: {error!r}")
+    return {'latencies': latencies, 'actions': actions, 'errors': errors, 'app': at}
+
+
+def load_test(sessions, interactions=20, think_time=0.0, seed=0, timeout=120):
+    """Run `sessions` concurrent sessions and summarise their reruns"""
+    barrier = threading.Barrier(sessions)
+
+    def session(session_id):
+        barrier.wait()  # start every session together
+        return run_session(session_id, interactions, think_time, seed, timeout)
+
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - start
+    # Measured while every session's AppTest (and its state) is still alive
+    rss_after = rss_bytes()
+
+    latencies = np.concatenate([result['latencies'] for result in results])
+    loads = np.array([result['latencies'][0] for result in results])
+    errors = [error for result in results for error in result['errors']]
+    summary = {
+        'sessions': sessions,
+        'reruns': int(latencies.size),
+        'errors': len(errors),
+        'elapsed_s': elapsed,
+        'throughput_rps': latencies.size / elapsed,
+        'latency_mean_ms': latencies.mean() * 1000,
+        'latency_max_ms': latencies.max() * 1000,
+        'first_load_p50_ms': float(np.median(loads)) * 1000,
+        'rss_mb': rss_after / 2**20,
+        'rss_per_session_mb': (rss_after - rss_before) / sessions / 2**20
+    }
+    for q, value in zip(QUANTILES, np.quantile(latencies, QUANTILES)):
+        summary[f"latency_p{q * 100:g}_ms"] = value * 1000
+    summary['error_samples'] = errors[:5]
+    return summary
+
+
+def capacity(summaries, slo_ms):
+    """Largest session count whose p90 rerun latency is within slo_ms (0 if none)"""
+    within = [summary['sessions'] for summary in summaries
+              if summary['latency_p90_ms'] <= slo_ms and not summary['errors']]
+    return max(within, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app's rerun path with concurrent headless sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10],
+                        help="concurrent session counts to test, in order (default: 1 5 10)")
+    parser.add_argument("--interactions", type=int, default=20, help="interactions per session (default: 20)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="max random pause between a session's interactions in seconds (default: 0)")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p90 rerun latency target (default: 500)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the interaction sequences (default: 0)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before a rerun counts as hung")
+    parser.add_argument("-o", "--output", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    # Per-rerun timing lines and bare-mode warnings would swamp the report
+    logging.disable(logging.WARNING)
+
+    # Pay the one-off imports before measuring, so they don't count as session memory
+    run_session(-1, 0, 0.0, args.seed, args.timeout)
+
+    summaries = []
+    print(f"{'sessions':>8}{'reruns':>8}{'rps':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'MB/session':>12}{'errors':>8}")
+    for sessions in args.sessions:
+        summary = load_test(sessions, args.interactions, args.think_time, args.seed, args.timeout)
+        summaries.append(summary)
+        print(f"{sessions:>8}{summary['reruns']:>8}{summary['throughput_rps']:>8.1f}"
+              f"{summary['latency_p50_ms']:>10.1f}{summary['latency_p90_ms']:>10.1f}{summary['latency_p99_ms']:>10.1f}"
+              f"{summary['rss_per_session_mb']:>12.2f}{summary['errors']:>8}")
+        for error in summary['error_samples']:
+            print(f"    {error}", file=sys.stderr)
+
+    supported = capacity(summaries, args.slo_ms)
+    print(f"\nCapacity: {supported} concurrent sessions within p90 {args.slo_ms:g} ms")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'slo_ms': args.slo_ms, 'capacity_sessions': supported, 'runs': summaries},
+                      file, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Chunked Monte Carlo valuation with streaming statistics"""
+import numpy as np
+
+from valuation_core import enterprise_value, equity_stake_exit, equity_value
+from waterfall import investor_payoff
+
+# Inputs that can be drawn from a distribution
+SIMULATED_INPUTS = (
+    'exit_revenue',
+    'ev_revenue_multiple',
+    'financial_debt',
+    'cash_balance',
+    'dilution_effect',
+    'exit_year'
+)
+
+# Outputs tracked for every path
+METRICS = ('equity_value', 'exit_proceeds', 'irr', 'multiple')
+
+DISTRIBUTIONS = ('fixed', 'normal', 'lognormal', 'uniform', 'triangular', 'discrete')
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def distribution_from_spread(kind, base, spread):
+    """Distribution spec centred on base with a relative spread (e.g. 0.2 = 20%)"""
+    if kind == 'fixed' or spread == 0:
+        return ('fixed', base)
+    if kind == 'normal':
+        return ('normal', base, abs(base) * spread)
+    if kind == 'lognormal':
+        return ('lognormal', base, spread)
+    if kind == 'uniform':
+        return ('uniform', base * (1 - spread), base * (1 + spread))
+    if kind == 'triangular':
+        return ('triangular', base * (1 - spread), base, base * (1 + spread))
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def sample(spec, size, rng):
+    """Draw size values from a distribution spec tuple (kind, *params).
+
+    fixed(value), normal(mean, sd), lognormal(median, sigma),
+    uniform(low, high), triangular(low, mode, high) and
+    discrete(values, probabilities).
+    """
+    kind, *params = spec
+    if kind == 'fixed':
+        return np.full(size, float(params[0]))
+    if kind == 'normal':
+        return rng.normal(params[0], params[1], size)
+    if kind == 'lognormal':
+        return params[0] * rng.lognormal(0.0, params[1], size)
+    if kind == 'uniform':
+        return rng.uniform(params[0], params[1], size)
+    if kind == 'triangular':
+        low, mode, high = params
+        if low == high:
+            return np.full(size, float(mode))
+        return rng.triangular(low, mode, high, size)
+    if kind == 'discrete':
+        values, probabilities = params
+        return rng.choice(np.asarray(values, dtype=float), size=size, p=probabilities)
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def sample_inputs(distributions, size, rng):
+    """Draw every simulated input, clipped to its economically valid range"""
+    draws = {name: sample(distributions[name], size, rng) for name in SIMULATED_INPUTS}
+    for name in ('exit_revenue', 'ev_revenue_multiple', 'financial_debt', 'cash_balance'):
+        np.maximum(draws[name], 0, out=draws[name])
+    np.clip(draws['dilution_effect'], 0, 1, out=draws['dilution_effect'])
+    draws['exit_year'] = np.maximum(np.rint(draws['exit_year']), 1)
+    return draws
+
+
+def evaluate_paths(draws, investment_amount, equity_stake_entry, preference=None):
+    """Exit outcomes of every path for an investment made today at a fixed price.
+
+    preference is None for pro-rata proceeds or (multiple, participating,
+    cap) to pay every path through waterfall.investor_payoff.
+    """
+    ev = enterprise_value(draws['exit_revenue'], draws['ev_revenue_multiple'])
+    equity = equity_value(ev, draws['financial_debt'], draws['cash_balance'])
+    stake_exit = equity_stake_exit(equity_stake_entry, draws['dilution_effect'])
+    if preference is None:
+        exit_proceeds = np.maximum(equity, 0) * stake_exit
+    else:
+        exit_proceeds = investor_payoff(equity, stake_exit, investment_amount, *preference)
+
+    multiple = exit_proceeds / investment_amount
+    # Single entry / single exit: closed-form IRR, a wipe-out is a -100% return
+    irr = multiple ** (1 / draws['exit_year']) - 1
+    return {
+        'equity_value': equity,
+        'exit_proceeds': exit_proceeds,
+        'irr': irr,
+        'multiple': multiple
+    }
+
+
+class StreamingStats:
+    """Mergeable running mean/variance and fixed-bin histogram of one metric.
+
+    Memory is O(bins) regardless of how many values are added; quantiles
+    are interpolated from the histogram, with values outside the bin range
+    counted in under/overflow buckets, and clamped to the observed min/max
+    so a point mass (e.g. every wipe-out at -100%) is not spread across
+    its bin.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(self.edges.size + 1, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are ignored)"""
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        self._combine(values.size, chunk_mean, chunk_m2)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        bins = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(bins, minlength=self.counts.size)
+
+    def merge(self, other):
+        """Fold another StreamingStats built with the same edges into this one"""
+        self.merge_state(other.state())
+
+    def state(self):
+        """Picklable partial statistics without the (shared) bin edges"""
+        return self.count, self.mean, self.m2, self.counts, self.min, self.max
+
+    def merge_state(self, state):
+        """Fold partial statistics produced by state() on the same edges"""
+        count, mean, m2, counts, low, high = state
+        if count:
+            self._combine(count, mean, m2)
+            self.counts += counts
+            self.min = min(self.min, low)
+            self.max = max(self.max, high)
+
+    def _combine(self, count, mean, m2):
+        # Chan et al. parallel update of mean and sum of squared deviations
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def ci_halfwidth(self, z=1.96):
+        """Half-width of the normal confidence interval of the mean"""
+        return z * self.std / np.sqrt(self.count) if self.count else np.inf
+
+    def quantile(self, q):
+        """Histogram-interpolated quantile(s)"""
+        cumulative = np.cumsum(self.counts)
+        target = np.asarray(q, dtype=float) * cumulative[-1]
+        bucket = np.clip(np.searchsorted(cumulative, target, side='left'), 1, self.edges.size - 1)
+        below = cumulative[bucket - 1]
+        in_bucket = np.maximum(self.counts[bucket], 1)
+        fraction = np.clip((target - below) / in_bucket, 0, 1)
+        low, high = self.edges[bucket - 1], self.edges[bucket]
+        return np.clip(low + fraction * (high - low), self.min, self.max)
+
+    def summary(self, quantiles=QUANTILES):
+        return {
+            'mean': self.mean,
+            'std': self.std,
+            'ci_halfwidth': self.ci_halfwidth(),
+            'quantiles': dict(zip(quantiles, self.quantile(quantiles)))
+        }
+
+
+def histogram_edges(values, bins=2000):
+    """Bin edges covering the bulk of a pilot sample with generous padding"""
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.linspace(-1, 1, bins + 1)
+    low, high = np.quantile(values, [0.0005, 0.9995])
+    pad = max(high - low, abs(high), 1e-9)
+    return np.linspace(low - pad, high + pad, bins + 1)
+
+
+def add_paths(stats, distributions, investment_amount, equity_stake_entry, size, rng, preference=None):
+    """Draw and value one chunk of paths and fold it into stats"""
+    outcomes = evaluate_paths(sample_inputs(distributions, size, rng), investment_amount, equity_stake_entry,
+                              preference)
+    for name in METRICS:
+        stats[name].update(outcomes[name])
+
+
+def pilot_edges(distributions, investment_amount, equity_stake_entry, size, rng, preference=None):
+    """Histogram edges per metric from a pilot sample"""
+    outcomes = evaluate_paths(sample_inputs(distributions, size, rng), investment_amount, equity_stake_entry,
+                              preference)
+    return {name: histogram_edges(outcomes[name]) for name in METRICS}
+
+
+def simulate(distributions, investment_amount, equity_stake_entry, n_paths=1_000_000,
+             chunk_size=100_000, seed=None, ci_tolerance=None, min_paths=100_000, preference=None):
+    """Monte Carlo exit outcomes evaluated in vectorized chunks.
+
+    distributions maps every name in SIMULATED_INPUTS to a spec tuple (see
+    sample). Paths are drawn and valued chunk_size at a time and folded
+    into StreamingStats, so memory stays bounded for any n_paths. If
+    ci_tolerance is given the run stops early once at least min_paths have
+    been drawn and the 95% confidence half-width of the mean IRR is within
+    it. preference applies liquidation-preference terms as in
+    evaluate_paths. Returns the number of paths used, whether the tolerance was met and
+    a StreamingStats per metric.
+    """
+    rng = np.random.default_rng(seed)
+
+    # A pilot chunk fixes the histogram ranges
+    edges = pilot_edges(distributions, investment_amount, equity_stake_entry, min(chunk_size, n_paths), rng,
+                        preference)
+    stats = {name: StreamingStats(edges[name]) for name in METRICS}
+    done = 0
+
+    converged = False
+    while done < n_paths:
+        if ci_tolerance is not None and done >= min_paths and stats['irr'].ci_halfwidth() <= ci_tolerance:
+            converged = True
+            break
+        size = min(chunk_size, n_paths - done)
+        add_paths(stats, distributions, investment_amount, equity_stake_entry, size, rng, preference)
+        done += size
+
+    if ci_tolerance is not None and not converged:
+        converged = stats['irr'].ci_halfwidth() <= ci_tolerance
+    return {'n_paths': done, 'converged': converged, 'stats': stats}
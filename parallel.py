@@ -0,0 +1,185 @@
+"""Process-pool execution of large Monte Carlo and sensitivity grid workloads"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from montecarlo import METRICS, StreamingStats, add_paths, pilot_edges
+from sensitivity import GRID_INPUTS, GRID_OUTPUTS, sensitivity_grid
+
+# Paths per task. Fixed so results depend on the seed, not on the worker count
+TASK_PATHS = 1_000_000
+
+
+class SharedArrays:
+    """A dict of float64 arrays packed into one shared memory block.
+
+    The owner creates the block and unlinks it on exit; workers receive the
+    picklable descriptor and attach() without copying the data.
+    """
+
+    def __init__(self, arrays=None, shapes=None):
+        shapes = dict(shapes or {})
+        arrays = {name: np.ascontiguousarray(value, dtype=float) for name, value in (arrays or {}).items()}
+        shapes.update({name: value.shape for name, value in arrays.items()})
+
+        self.layout = {}
+        offset = 0
+        for name, shape in shapes.items():
+            self.layout[name] = (offset, tuple(shape))
+            offset += int(np.prod(shape)) * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.arrays = _views(self.shm, self.layout)
+        for name, value in arrays.items():
+            self.arrays[name][...] = value
+
+    @property
+    def descriptor(self):
+        return self.shm.name, self.layout
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _views(shm, layout):
+    return {name: np.ndarray(shape, dtype=float, buffer=shm.buf, offset=offset)
+            for name, (offset, shape) in layout.items()}
+
+
+def attach(descriptor):
+    """Open a SharedArrays block from a worker; returns (shm, arrays)"""
+    name, layout = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, _views(shm, layout)
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _executor(workers):
+    # spawn: never fork a multi-threaded server process
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _run_paths(edges, distributions, investment_amount, equity_stake_entry, n_paths, chunk_size, seed,
+               preference=None):
+    stats = {name: StreamingStats(edges[name]) for name in METRICS}
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done < n_paths:
+        size = min(chunk_size, n_paths - done)
+        add_paths(stats, distributions, investment_amount, equity_stake_entry, size, rng, preference)
+        done += size
+    return {name: stats[name].state() for name in METRICS}
+
+
+def _simulate_task(descriptor, *args):
+    shm, edges = attach(descriptor)
+    try:
+        return _run_paths(edges, *args)
+    finally:
+        # Views into the block must be gone before it can be closed
+        edges = None
+        shm.close()
+
+
+def simulate_parallel(distributions, investment_amount, equity_stake_entry, n_paths=100_000_000,
+                      chunk_size=100_000, seed=None, ci_tolerance=None, min_paths=100_000,
+                      workers=None, task_paths=TASK_PATHS, preference=None):
+    """montecarlo.simulate spread over a process pool.
+
+    Paths are split into fixed-size tasks, each with its own RNG stream
+    spawned from one SeedSequence, so a given seed gives the same result
+    for any number of workers. Histogram edges are shared with the workers
+    through shared memory and only partial statistics are sent back, then
+    merged in task order. With ci_tolerance, tasks not yet started are
+    cancelled once the merged mean IRR is tight enough.
+    """
+    seed_sequence = np.random.SeedSequence(seed)
+    pilot_seed, *task_seeds = seed_sequence.spawn(1 + -(-n_paths // task_paths))
+    edges = pilot_edges(distributions, investment_amount, equity_stake_entry,
+                        min(chunk_size, n_paths), np.random.default_rng(pilot_seed), preference)
+    stats = {name: StreamingStats(edges[name]) for name in METRICS}
+
+    sizes = [min(task_paths, n_paths - start) for start in range(0, n_paths, task_paths)]
+    converged = False
+    done = 0
+    with SharedArrays(edges) as shared, _executor(workers or default_workers()) as pool:
+        futures = [pool.submit(_simulate_task, shared.descriptor, distributions, investment_amount,
+                               equity_stake_entry, size, chunk_size, task_seed, preference)
+                   for size, task_seed in zip(sizes, task_seeds)]
+        for future, size in zip(futures, sizes):
+            for name, state in future.result().items():
+                stats[name].merge_state(state)
+            done += size
+            if ci_tolerance is not None and done >= min_paths and stats['irr'].ci_halfwidth() <= ci_tolerance:
+                converged = True
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    if ci_tolerance is not None and not converged:
+        converged = stats['irr'].ci_halfwidth() <= ci_tolerance
+    return {'n_paths': done, 'converged': converged, 'stats': stats}
+
+
+def _fill_slab(inputs, outputs, scalars, axis_names, start, stop):
+    arguments = dict(scalars)
+    arguments.update({name: inputs[name] for name in axis_names})
+    # Each task owns a slab of the first axis
+    arguments[axis_names[0]] = inputs[axis_names[0]][start:stop]
+    grid = sensitivity_grid(**arguments)
+    for name in GRID_OUTPUTS:
+        outputs[name][start:stop] = grid[name]
+
+
+def _grid_task(inputs_descriptor, outputs_descriptor, *args):
+    in_shm, inputs = attach(inputs_descriptor)
+    out_shm, outputs = attach(outputs_descriptor)
+    try:
+        _fill_slab(inputs, outputs, *args)
+    finally:
+        inputs = outputs = None
+        in_shm.close()
+        out_shm.close()
+
+
+def sensitivity_grid_parallel(workers=None, tasks_per_worker=4, **inputs):
+    """sensitivity.sensitivity_grid split along its first axis over a process pool.
+
+    Axis arrays and the output grids live in shared memory, so neither the
+    inputs nor the results are pickled between processes.
+    """
+    axis_names = [name for name in GRID_INPUTS if np.ndim(inputs[name]) > 0]
+    if not axis_names:
+        return sensitivity_grid(**inputs)
+    axes = {name: np.asarray(inputs[name], dtype=float) for name in axis_names}
+    scalars = {name: inputs[name] for name in GRID_INPUTS if name not in axes}
+    grid_shape = tuple(axis.size for axis in axes.values())
+
+    workers = workers or default_workers()
+    bounds = np.linspace(0, grid_shape[0], min(workers * tasks_per_worker, grid_shape[0]) + 1).astype(int)
+
+    with SharedArrays(axes) as shared_inputs, \
+            SharedArrays(shapes={name: grid_shape for name in GRID_OUTPUTS}) as shared_outputs, \
+            _executor(workers) as pool:
+        futures = [pool.submit(_grid_task, shared_inputs.descriptor, shared_outputs.descriptor,
+                               scalars, axis_names, start, stop)
+                   for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        for future in futures:
+            future.result()
+        result = {name: shared_outputs.arrays[name].copy() for name in GRID_OUTPUTS}
+
+    result['axes'] = axes
+    return result
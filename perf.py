@@ -0,0 +1,134 @@
+"""Per-stage timing of app reruns.
+
+Wrap a rerun in Rerun(...) and its stages in stage('name') (or decorate a
+function with timed('name')). When the rerun finishes, each stage duration
+is added to rolling windows -- one per session, one for the whole server --
+and a single JSON line with the rerun's timings is logged. Stages timed
+outside any rerun (e.g. a deferred export building its file on download)
+go straight to the server-wide window.
+"""
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+logger = logging.getLogger('vc_valuation.perf')
+if not logger.handlers:
+    # One machine-readable line per rerun, independent of Streamlit's logging config
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current = contextvars.ContextVar('perf_rerun', default=None)
+
+
+class RollingTimings:
+    """Last `window` durations of every stage, with percentile summaries"""
+
+    def __init__(self, window=500):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def summary(self, quantiles=QUANTILES):
+        """{stage: {'count', 'mean_ms', 'p50_ms', ...}} over the current window"""
+        with self.lock:
+            snapshot = {name: np.array(samples) for name, samples in self.samples.items()}
+        summary = {}
+        for name, samples in snapshot.items():
+            stats = {'count': samples.size, 'mean_ms': samples.mean() * 1000}
+            for q, value in zip(quantiles, np.quantile(samples, quantiles)):
+                stats[f"p{q * 100:g}_ms"] = value * 1000
+            summary[name] = stats
+        return summary
+
+
+# Shared by every session served by this process
+SERVER_TIMINGS = RollingTimings(window=5000)
+
+
+class Rerun:
+    """Times one rerun (or fragment rerun) and the stages entered inside it.
+
+    A Rerun opened inside another one is recorded as a stage of the outer
+    rerun, so a fragment's timings land in the full rerun when the whole
+    page runs and stand on their own when only the fragment reruns.
+    """
+
+    def __init__(self, name='rerun', sinks=(SERVER_TIMINGS,), context=None):
+        self.name = name
+        self.sinks = sinks
+        self.context = context or {}
+        self.stages = {}
+
+    def record(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self.token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.total = time.perf_counter() - self.start
+        _current.reset(self.token)
+        if self.parent is not None:
+            self.parent.record(self.name, self.total)
+            for name, seconds in self.stages.items():
+                self.parent.record(f"{self.name}.{name}", seconds)
+            return
+        for sink in self.sinks:
+            sink.record(self.name, self.total)
+            for name, seconds in self.stages.items():
+                sink.record(name, seconds)
+        logger.info(json.dumps({
+            'event': self.name,
+            **self.context,
+            'total_ms': round(self.total * 1000, 3),
+            'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'error': exc_type.__name__ if exc_type else None
+        }))
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one stage of the current rerun"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        rerun = _current.get()
+        if rerun is not None:
+            rerun.record(name, seconds)
+        else:
+            SERVER_TIMINGS.record(name, seconds)
+
+
+def timed(name=None):
+    """Decorator form of stage(); the stage defaults to the function name"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name or function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,133 @@
+"""Named scenario sets valued in one broadcast pass.
+
+A scenario is a dict with a 'name', a probability 'weight' and
+'overrides': {input: (mode, value)}, where mode is 'factor' (multiply the
+base-case input) or 'absolute' (replace it). Inputs without an override
+keep their base-case value. evaluate_scenarios stacks every scenario into
+one array per input and values them all with a single value_deals call,
+so a set of hundreds of scenarios costs about the same as three; the
+probability-weighted outputs give a First Chicago style expected value.
+"""
+import json
+
+import numpy as np
+
+from valuation_core import value_deals
+
+# Inputs a scenario can override, in pipeline order
+SCENARIO_INPUTS = (
+    'exit_revenue',
+    'ev_revenue_multiple',
+    'financial_debt',
+    'cash_balance',
+    'discount_rate',
+    'exit_year',
+    'equity_stake_entry',
+    'dilution_effect'
+)
+OVERRIDE_MODES = ('factor', 'absolute')
+
+# Result arrays of every scenario set, weighted into the expected value
+SCENARIO_OUTPUTS = ('present_value', 'investment_amount', 'exit_proceeds', 'investor_irr', 'cash_on_cash_multiple')
+
+DEFAULT_SCENARIOS = [
+    {'name': 'Conservative', 'weight': 0.25,
+     'overrides': {'exit_revenue': ('factor', 0.8), 'ev_revenue_multiple': ('factor', 0.7)}},
+    {'name': 'Base Case', 'weight': 0.5, 'overrides': {}},
+    {'name': 'Optimistic', 'weight': 0.25,
+     'overrides': {'exit_revenue': ('factor', 1.2), 'ev_revenue_multiple': ('factor', 1.3)}}
+]
+
+
+def normalized_weights(weights):
+    """Probability weights scaled to sum to 1 (equal weights if they are all zero)"""
+    weights = np.asarray(weights, dtype=float)
+    if np.any(weights < 0) or not np.all(np.isfinite(weights)):
+        raise ValueError("Scenario weights must be finite and non-negative")
+    total = weights.sum()
+    if total == 0:
+        return np.full(weights.shape, 1 / max(weights.size, 1))
+    return weights / total
+
+
+def scenario_inputs(base, scenarios):
+    """One array per input with every scenario's value of it.
+
+    base maps each of SCENARIO_INPUTS to its base-case value. The overrides
+    are flattened into index/value arrays first, so each input is filled
+    with one masked assignment rather than per-scenario arithmetic.
+    """
+    n = len(scenarios)
+    rows, names, absolute, values = [], [], [], []
+    for row, scenario in enumerate(scenarios):
+        for name, (mode, value) in scenario.get('overrides', {}).items():
+            if name not in SCENARIO_INPUTS:
+                raise ValueError(f"Unknown scenario input {name}; choose one of {', '.join(SCENARIO_INPUTS)}")
+            if mode not in OVERRIDE_MODES:
+                raise ValueError(f"Unknown override mode {mode}; choose one of {', '.join(OVERRIDE_MODES)}")
+            rows.append(row)
+            names.append(name)
+            absolute.append(mode == 'absolute')
+            values.append(value)
+    rows, names = np.asarray(rows, dtype=int), np.asarray(names, dtype=object)
+    absolute, values = np.asarray(absolute, dtype=bool), np.asarray(values, dtype=float)
+
+    inputs = {}
+    for name in SCENARIO_INPUTS:
+        column = np.full(n, float(base[name]))
+        selected = names == name
+        factor = selected & ~absolute
+        column[rows[factor]] *= values[factor]
+        column[rows[selected & absolute]] = values[selected & absolute]
+        inputs[name] = column
+    return inputs
+
+
+def evaluate_scenarios(base, scenarios, preference=None):
+    """Value every scenario together.
+
+    preference is None for pro-rata exit proceeds or (multiple,
+    participating, cap) to pay every scenario's exit through the
+    liquidation-preference waterfall. Returns {'names', 'weights'
+    (normalized), 'inputs': scenario_inputs, 'results': value_deals arrays,
+    'expected': probability-weighted outputs}. An output that is undefined
+    in any scenario with a positive weight (an IRR with no positive exit,
+    say) has an undefined expected value.
+    """
+    inputs = scenario_inputs(base, scenarios)
+    weights = normalized_weights([scenario.get('weight', 1.0) for scenario in scenarios])
+    results = value_deals(**inputs, preference=preference)
+    expected = {}
+    for name in SCENARIO_OUTPUTS:
+        weighted = np.where(weights > 0, weights * results[name], 0.0)
+        undefined = np.any((weights > 0) & ~np.isfinite(results[name]))
+        expected[name] = np.nan if undefined or not weights.size else float(weighted.sum())
+    return {
+        'names': [scenario['name'] for scenario in scenarios],
+        'weights': weights,
+        'inputs': inputs,
+        'results': results,
+        'expected': expected
+    }
+
+
+def scenarios_to_json(scenarios):
+    """Scenario set as a JSON document that scenarios_from_json reads back"""
+    return json.dumps([
+        {'name': scenario['name'], 'weight': scenario.get('weight', 1.0),
+         'overrides': {name: list(override) for name, override in scenario.get('overrides', {}).items()}}
+        for scenario in scenarios
+    ], indent=2)
+
+
+def scenarios_from_json(text):
+    """Scenario set from scenarios_to_json output, validated"""
+    scenarios = [
+        {'name': str(scenario['name']), 'weight': float(scenario.get('weight', 1.0)),
+         'overrides': {name: (mode, float(value)) for name, (mode, value) in scenario.get('overrides', {}).items()}}
+        for scenario in json.loads(text)
+    ]
+    # Raises on unknown inputs, modes or weights
+    scenario_inputs(dict.fromkeys(SCENARIO_INPUTS, 1.0), scenarios)
+    normalized_weights([scenario['weight'] for scenario in scenarios])
+    return scenarios
@@ -0,0 +1,83 @@
+"""Broadcast sensitivity grids over the valuation inputs"""
+import numpy as np
+
+from valuation_core import value_deals
+
+# Inputs that can be turned into grid axes, in pipeline order
+GRID_INPUTS = (
+    'exit_revenue',
+    'ev_revenue_multiple',
+    'financial_debt',
+    'cash_balance',
+    'discount_rate',
+    'exit_year',
+    'equity_stake_entry',
+    'dilution_effect'
+)
+
+# Result arrays of every grid
+GRID_OUTPUTS = ('present_value', 'investment', 'exit_proceeds', 'irr', 'multiple')
+
+
+def sensitivity_grid(exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                     discount_rate, exit_year, equity_stake_entry, dilution_effect, preference=None):
+    """Evaluate the valuation pipeline on the outer product of the given axes.
+
+    Every input is either a scalar or a 1-D array of values. Each array input
+    becomes one axis of the grid (in GRID_INPUTS order) and the whole grid is
+    computed in a single NumPy broadcast. Returns a dict with the 'axes' used
+    and arrays for present_value, investment, exit_proceeds, irr and multiple.
+    preference (multiple, participating, cap) pays the exit proceeds through
+    the liquidation-preference waterfall, as in value_deals.
+    """
+    inputs = dict(zip(GRID_INPUTS, (exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                                    discount_rate, exit_year, equity_stake_entry, dilution_effect)))
+    axes = {name: np.asarray(value, dtype=float) for name, value in inputs.items()
+            if np.ndim(value) > 0}
+    n_axes = len(axes)
+
+    # Give every axis its own dimension so the arithmetic broadcasts to the grid
+    values = {}
+    for name, value in inputs.items():
+        if name in axes:
+            position = list(axes).index(name)
+            shape = [1] * n_axes
+            shape[position] = -1
+            values[name] = axes[name].reshape(shape)
+        else:
+            values[name] = float(value)
+
+    results = value_deals(**values, preference=preference)
+
+    grid_shape = tuple(axis.size for axis in axes.values())
+    return {
+        'axes': axes,
+        'present_value': np.broadcast_to(results['present_value'], grid_shape),
+        'investment': np.broadcast_to(results['investment_amount'], grid_shape),
+        'exit_proceeds': np.broadcast_to(results['exit_proceeds'], grid_shape),
+        'irr': np.broadcast_to(results['investor_irr'], grid_shape),
+        'multiple': np.broadcast_to(results['cash_on_cash_multiple'], grid_shape)
+    }
+
+
+def grid_columns(grid):
+    """Column names of the long-format table produced by iter_grid_rows"""
+    return list(grid['axes']) + list(GRID_OUTPUTS)
+
+
+def iter_grid_rows(grid, chunk_size=100_000):
+    """Yield the grid in long format, one dict of column arrays per chunk.
+
+    Each row is one grid cell: its axis values followed by the outputs, so
+    grids far larger than a spreadsheet can be exported without ever
+    materializing the full table.
+    """
+    axes = grid['axes']
+    shape = tuple(axis.size for axis in axes.values())
+    size = int(np.prod(shape))
+    for start in range(0, size, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, size))
+        index = np.unravel_index(flat, shape)
+        chunk = {name: axis[i] for (name, axis), i in zip(axes.items(), index)}
+        chunk.update({name: np.asarray(grid[name]).reshape(-1)[flat] for name in GRID_OUTPUTS})
+        yield chunk
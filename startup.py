@@ -0,0 +1,74 @@
+"""Lazy loading of heavy dependencies and an import-time report.
+
+The app imports Plotly, pandas and openpyxl through lazy_import() at the
+point a section first needs them, and every first import is timed so
+import_report() shows what each rerun actually paid for.
+
+Run `python startup.py` for the cold (fresh interpreter) import time of
+each dependency the app can load.
+"""
+import importlib
+import re
+import subprocess
+import sys
+import time
+
+# Modules the app imports eagerly or lazily, for the cold-start report
+APP_MODULES = (
+    'numpy',
+    'streamlit',
+    'valuation_core',
+    'irr',
+    'sensitivity',
+    'montecarlo',
+    'parallel',
+    'pandas',
+    'plotly.graph_objects',
+    'openpyxl'
+)
+
+_import_times = {}
+
+
+def lazy_import(name):
+    """Import a module on first use, recording how long that first import took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = time.perf_counter() - start
+    return module
+
+
+def import_report():
+    """Seconds spent in each lazy import performed by this process so far"""
+    return dict(_import_times)
+
+
+def cold_import_times(modules=APP_MODULES, python=sys.executable):
+    """Cumulative import time of each module in a fresh interpreter (seconds).
+
+    Uses `python -X importtime`, so the figure includes everything the
+    module pulls in that the interpreter had not loaded yet.
+    """
+    times = {}
+    for name in modules:
+        completed = subprocess.run([python, '-X', 'importtime', '-c', f'import {name}'],
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            times[name] = None
+            continue
+        match = re.search(rf'\|\s*(\d+)\s*\|\s*{re.escape(name)}\s*$', completed.stderr, re.MULTILINE)
+        times[name] = int(match.group(1)) / 1e6 if match else None
+    return times
+
+
+def main():
+    for name, seconds in cold_import_times().items():
+        timing = "not installed" if seconds is None else f"{seconds * 1000:8.1f} ms"
+        print(f"{name:<24}{timing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import numpy as np
+
+from captable import dilution_from_rounds, ownership_paths, round_retention
+
+
+def test_round_retention():
+    np.testing.assert_allclose(round_retention(8e6, 2e6), 0.8)
+    np.testing.assert_allclose(round_retention(8e6, 2e6, 0.1, pool_in_pre_money=True), 0.7)
+    np.testing.assert_allclose(round_retention(8e6, 2e6, 0.1, pool_in_pre_money=False), 0.72)
+    np.testing.assert_allclose(round_retention(1e6, 9e6, 0.2), 0.0)
+
+
+def test_ownership_paths_follow_dilution():
+    rng = np.random.default_rng(0)
+    pre_money = rng.uniform(5e6, 50e6, (3, 100))
+    new_money = rng.uniform(1e6, 10e6, (3, 100))
+    option_pool = rng.uniform(0.0, 0.1, (3, 100))
+    paths = ownership_paths(0.2, pre_money, new_money, option_pool)
+    assert paths.shape == (4, 100)
+    np.testing.assert_allclose(paths[0], 0.2)
+    assert (np.diff(paths, axis=0) <= 0).all()
+    np.testing.assert_allclose(paths[-1], 0.2 * (1 - dilution_from_rounds(pre_money, new_money, option_pool)))
+
+
+def test_single_round():
+    np.testing.assert_allclose(dilution_from_rounds(8e6, 2e6), 0.2)
+    np.testing.assert_allclose(ownership_paths(0.1, 8e6, 2e6), [0.1, 0.08])
@@ -0,0 +1,52 @@
+import numpy as np
+
+from derivatives import GRADIENT_INPUTS, GRADIENT_OUTPUTS, elasticities, value_gradients
+from valuation_core import value_deals
+
+
+def random_deals(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'exit_year': rng.integers(2, 10, n).astype(float),
+        'exit_revenue': rng.uniform(1e6, 1e8, n),
+        'ev_revenue_multiple': rng.uniform(1.0, 10.0, n),
+        'financial_debt': rng.uniform(0.0, 1e6, n),
+        'cash_balance': rng.uniform(0.0, 1e6, n),
+        'discount_rate': rng.uniform(0.1, 0.6, n),
+        'equity_stake_entry': rng.uniform(0.05, 0.5, n),
+        'dilution_effect': rng.uniform(0.0, 0.5, n)
+    }
+
+
+def test_gradients_match_central_differences():
+    deals = random_deals()
+    result = value_gradients(**deals)
+    equity = result['values']['equity_value']
+    # Natural size of each input; balance-sheet items move the equity value
+    scale = {**{name: np.abs(deals[name]) for name in GRADIENT_INPUTS}, 'financial_debt': equity,
+             'cash_balance': equity, 'discount_rate': 1.0, 'equity_stake_entry': 1.0, 'dilution_effect': 1.0}
+
+    for name in GRADIENT_INPUTS:
+        step = 1e-5 * scale[name]
+        up = value_deals(**{**deals, name: deals[name] + step})
+        down = value_deals(**{**deals, name: deals[name] - step})
+        for output in GRADIENT_OUTPUTS:
+            difference = (up[output] - down[output]) / (2 * step)
+            gradient = result['gradient'][output][name]
+            tolerance = 5e-9 * (np.abs(gradient) + (1 + np.abs(result['values'][output])) / scale[name])
+            assert (np.abs(difference - gradient) <= tolerance).all(), (output, name)
+
+
+def test_undefined_outputs_have_no_gradient():
+    result = value_gradients(5, 1e6, 1.0, 5e6, 0.0, 0.3, 0.1, 0.2)
+    assert np.isnan(result['values']['investor_irr'])
+    assert all(np.isnan(result['gradient']['investor_irr'][name]) for name in GRADIENT_INPUTS)
+    assert all(np.isnan(result['gradient']['cash_on_cash_multiple'][name]) for name in GRADIENT_INPUTS)
+
+
+def test_elasticities_of_proportional_inputs():
+    deals = {**random_deals(n=10), 'financial_debt': 0.0, 'cash_balance': 0.0}
+    elasticity = elasticities(value_gradients(**deals))
+    np.testing.assert_allclose(elasticity['present_value']['exit_revenue'], 1.0)
+    np.testing.assert_allclose(elasticity['investment_amount']['ev_revenue_multiple'], 1.0)
+    np.testing.assert_allclose(elasticity['exit_proceeds']['equity_stake_entry'], 1.0)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from goalseek import GOAL_VARIABLES, break_even_surface, goal_seek, required_multiple
+from valuation_core import enterprise_value, equity_stake_exit, equity_value
+from waterfall import investor_payoff
+
+DEAL = {
+    'investment_amount': 2e6,
+    'exit_year': 5,
+    'exit_revenue': 10e6,
+    'ev_revenue_multiple': 4.0,
+    'financial_debt': 1e6,
+    'cash_balance': 0.5e6,
+    'equity_stake_entry': 0.15,
+    'dilution_effect': 0.2
+}
+PREFERENCES = [None, (1.0, False, None), (2.0, False, None), (1.0, True, None), (1.0, True, 2.0)]
+
+
+def proceeds_with(solve_for, value, preference):
+    """Exit proceeds of DEAL with value substituted for solve_for"""
+    inputs = dict(DEAL)
+    if solve_for == 'pre_money':
+        inputs['equity_stake_entry'] = DEAL['investment_amount'] / (value + DEAL['investment_amount'])
+    else:
+        inputs[solve_for] = value
+    equity = equity_value(enterprise_value(inputs['exit_revenue'], inputs['ev_revenue_multiple']),
+                          inputs['financial_debt'], inputs['cash_balance'])
+    stake = equity_stake_exit(inputs['equity_stake_entry'], inputs['dilution_effect'])
+    if preference is None:
+        return equity * stake
+    return investor_payoff(equity, stake, DEAL['investment_amount'], *preference)
+
+
+@pytest.mark.parametrize('preference', PREFERENCES)
+@pytest.mark.parametrize('solve_for', GOAL_VARIABLES)
+def test_solution_hits_target(solve_for, preference):
+    target_irr = np.array([0.15, 0.3, 0.5])
+    solution = goal_seek(solve_for, target_irr=target_irr, preference=preference, **DEAL)
+    assert np.isfinite(solution).all()
+    required = DEAL['investment_amount'] * (1 + target_irr) ** DEAL['exit_year']
+    np.testing.assert_allclose(proceeds_with(solve_for, solution, preference), required, rtol=1e-8)
+
+
+def test_target_multiple_equals_target_irr():
+    by_irr = goal_seek('ev_revenue_multiple', target_irr=0.25, **DEAL)
+    by_multiple = goal_seek('ev_revenue_multiple', target_multiple=required_multiple(5, target_irr=0.25), **DEAL)
+    np.testing.assert_allclose(by_irr, by_multiple)
+    with pytest.raises(ValueError):
+        required_multiple(5, target_irr=0.25, target_multiple=3.0)
+
+
+def test_unreachable_targets_are_nan():
+    # Net debt eats the whole exit: no stake reaches the target
+    assert np.isnan(goal_seek('equity_stake_entry', 1e6, 5, 1e6, 1.0, financial_debt=5e6, target_irr=0.3))
+    assert np.isnan(goal_seek('equity_stake_entry', 1e6, 5, 1e6, 1.0, financial_debt=5e6, target_irr=0.3,
+                              preference=(1.0, False, None)))
+    # A stake above 100% is not a deal
+    assert np.isnan(goal_seek('equity_stake_entry', 5e6, 5, 1e6, 2.0, target_irr=0.3))
+
+
+def test_preference_alone_pays_target():
+    pre_money = goal_seek('pre_money', 2e6, 2, 10e6, 10.0, target_irr=0.0, preference=(1.0, False, None))
+    assert np.isposinf(pre_money)
+    pre_money = goal_seek('pre_money', 2e6, 2, 10e6, 10.0, target_irr=0.01, preference=(1.0, False, None))
+    assert np.isfinite(pre_money)
+
+
+def test_break_even_surface_matches_goal_seek():
+    exit_years, discount_rates = np.arange(3, 8), np.linspace(0.1, 0.6, 6)
+    inputs = {name: DEAL[name] for name in ('investment_amount', 'exit_revenue', 'ev_revenue_multiple',
+                                            'financial_debt', 'cash_balance', 'equity_stake_entry',
+                                            'dilution_effect')}
+    surface = break_even_surface(exit_years=exit_years, discount_rates=discount_rates, **inputs)
+    expected = goal_seek('ev_revenue_multiple', exit_year=exit_years[:, None],
+                         target_irr=discount_rates[None, :], **inputs)
+    np.testing.assert_allclose(surface['ev_revenue_multiple'], expected, rtol=1e-14)
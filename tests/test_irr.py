@@ -0,0 +1,61 @@
+import numpy as np
+
+from irr import irr_batch, xirr_batch, xnpv_batch
+from valuation_core import calculate_irr, investor_cash_flows
+
+DATES = np.datetime64('2025-01-01') + 365 * np.arange(11)
+
+
+def single_exit_rows(n=1000, seed=0):
+    """Single entry / single exit rows with exits spread over ten years"""
+    rng = np.random.default_rng(seed)
+    investment = rng.uniform(1e5, 1e7, n)
+    exit_year = rng.integers(1, 11, n)
+    cash_flows = np.zeros((n, 11))
+    cash_flows[:, 0] = -investment
+    cash_flows[np.arange(n), exit_year] = investment * rng.uniform(0.2, 8.0, n)
+    return cash_flows
+
+
+def test_closed_form_matches_iterative_solver():
+    cash_flows = single_exit_rows()
+    closed_form = xirr_batch(cash_flows, DATES)
+
+    # Splitting the entry into two flows on the same date keeps the rate but forces the Newton path
+    split = np.concatenate([cash_flows[:, :1] / 2, cash_flows[:, :1] / 2, cash_flows[:, 1:]], axis=1)
+    iterative, converged = xirr_batch(split, np.concatenate([DATES[:1], DATES]), tol=1e-14, max_iter=100,
+                                      full_output=True)
+    assert converged.all()
+    np.testing.assert_allclose(closed_form, iterative, rtol=3e-16, atol=1e-15)
+
+
+def test_irr_batch_periodic_rates():
+    rates = irr_batch(single_exit_rows())
+    np.testing.assert_allclose(irr_batch([[-100, 0, 121]]), [0.1], rtol=1e-14)
+    assert np.isfinite(rates).all() and (rates > -1).all()
+
+
+def test_multiple_flows_zero_npv():
+    amounts = np.array([
+        [-1000.0, 300.0, 400.0, 500.0],
+        [-1000.0, -500.0, 200.0, 2500.0],
+        [-1000.0, 2000.0, -1100.0, 300.0]
+    ])
+    dates = np.array(['2024-01-15', '2024-09-30', '2025-06-01', '2027-02-28'], dtype='datetime64[D]')
+    rates, converged = xirr_batch(amounts, dates, full_output=True)
+    assert converged.all()
+    np.testing.assert_allclose(xnpv_batch(rates, amounts, dates), 0.0, atol=1e-6)
+
+
+def test_padded_deals_match_unpadded():
+    dates = np.array([['2024-01-01', '2025-07-01', '2026-01-01'],
+                      ['2024-01-01', '2026-01-01', 'NaT']], dtype='datetime64[D]')
+    amounts = np.array([[-100.0, 10.0, 120.0], [-100.0, 130.0, np.nan]])
+    padded = xirr_batch(amounts, dates)
+    np.testing.assert_allclose(padded[1], xirr_batch([[-100.0, 130.0]], dates[1, :2])[0], rtol=1e-14)
+
+
+def test_no_sign_change_has_no_irr():
+    rates, converged = irr_batch([[-100.0, -10.0, -5.0], [100.0, 10.0, 0.0], [0.0, 0.0, 0.0]], full_output=True)
+    assert np.isnan(rates).all() and not converged.any()
+    assert np.isnan(calculate_irr(investor_cash_flows(100.0, 0.0, 5)))
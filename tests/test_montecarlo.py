@@ -0,0 +1,52 @@
+import numpy as np
+
+from montecarlo import METRICS, StreamingStats, distribution_from_spread, simulate
+
+
+def test_merged_chunks_match_single_pass():
+    values = np.random.default_rng(0).lognormal(0.0, 1.0, 100_000)
+    edges = np.linspace(0.0, 20.0, 201)
+    single = StreamingStats(edges)
+    single.update(values)
+
+    merged = StreamingStats(edges)
+    for chunk in np.array_split(values, 7):
+        partial = StreamingStats(edges)
+        partial.update(chunk)
+        merged.merge_state(partial.state())
+
+    assert merged.count == values.size
+    np.testing.assert_allclose(merged.mean, values.mean(), rtol=1e-12)
+    np.testing.assert_allclose(merged.std, values.std(ddof=1), rtol=1e-10)
+    np.testing.assert_array_equal(merged.counts, single.counts)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_quantiles_stay_in_observed_range():
+    rng = np.random.default_rng(0)
+    # Wipe-outs are a point mass at -100% in the middle of a bin
+    irr = np.concatenate([np.full(3000, -1.0), rng.uniform(0.0, 3.0, 7000)])
+    stats = StreamingStats(np.linspace(-2.05, 4.95, 71))
+    stats.update(irr)
+    quantiles = stats.quantile([0.05, 0.1, 0.5, 1.0])
+    assert quantiles[0] == quantiles[1] == -1.0
+    assert quantiles[-1] <= irr.max()
+    np.testing.assert_allclose(quantiles[2], np.quantile(irr, 0.5), atol=0.1)
+
+
+def test_simulate_is_reproducible():
+    distributions = {
+        'exit_revenue': distribution_from_spread('lognormal', 10e6, 0.3),
+        'ev_revenue_multiple': distribution_from_spread('triangular', 4.0, 0.5),
+        'financial_debt': ('fixed', 1e6),
+        'cash_balance': ('fixed', 0.0),
+        'dilution_effect': distribution_from_spread('uniform', 0.2, 0.5),
+        'exit_year': ('discrete', [4, 5, 6], [0.25, 0.5, 0.25])
+    }
+    runs = [simulate(distributions, 1e6, 0.1, n_paths=50_000, chunk_size=10_000, seed=7) for _ in range(2)]
+    preferred = simulate(distributions, 1e6, 0.1, n_paths=50_000, chunk_size=10_000, seed=7,
+                         preference=(1.0, False, None))
+    for name in METRICS:
+        assert runs[0]['stats'][name].mean == runs[1]['stats'][name].mean
+    # A non-participating preference never pays less than pro-rata
+    assert preferred['stats']['exit_proceeds'].mean >= runs[0]['stats']['exit_proceeds'].mean
@@ -0,0 +1,52 @@
+import numpy as np
+
+from valuation_core import anniversary_dates, cash_flow_schedule, investor_returns, value_deals
+
+DEAL = (5, 10e6, 4.0, 1e6, 0.5e6, 0.3, 0.15, 0.2)
+
+
+def test_irr_follows_pricing_convention():
+    deal = value_deals(*DEAL)
+    # The investment is priced at the discounted exit equity, so IRR = (1 + r) (1 - d) ** (1 / T) - 1
+    np.testing.assert_allclose(deal['investor_irr'], 1.3 * 0.8 ** (1 / 5) - 1)
+    np.testing.assert_allclose(deal['cash_on_cash_multiple'], 1.3 ** 5 * 0.8)
+    np.testing.assert_allclose(deal['equity_value'], 39.5e6)
+
+
+def test_negative_equity_has_no_irr():
+    deal = value_deals(5, 1e6, 1.0, 5e6, 0.0, 0.3, 0.1, 0.2)
+    assert deal['equity_value'] < 0 and deal['investment_amount'] < 0
+    assert np.isnan(deal['investor_irr'])
+    assert deal['cash_on_cash_multiple'] == 0.0
+    with_preference = value_deals(5, 1e6, 1.0, 5e6, 0.0, 0.3, 0.1, 0.2, preference=(1.0, False, None))
+    assert np.isnan(with_preference['investor_irr'])
+    assert with_preference['exit_proceeds'] == 0.0
+
+
+def test_preference_adds_to_pro_rata():
+    pro_rata = value_deals(*DEAL)
+    preferred = value_deals(*DEAL, preference=(4.0, False, None))
+    np.testing.assert_allclose(preferred['exit_proceeds'], 4 * preferred['investment_amount'])
+    assert preferred['exit_proceeds'] > pro_rata['exit_proceeds']
+
+
+def test_investor_returns_edge_cases():
+    irr, multiple = investor_returns(np.array([100.0, 100.0, 0.0]), np.array([200.0, 0.0, 50.0]), 2)
+    np.testing.assert_allclose(irr[0], np.sqrt(2) - 1)
+    assert np.isnan(irr[1:]).all()
+    np.testing.assert_allclose(multiple, [2.0, 0.0, 0.0])
+
+
+def test_cash_flow_schedule_rows():
+    schedule = cash_flow_schedule([3, 5], 10e6, 4.0, 1e6, 0.5e6, 0.3, 0.15, 0.2, years_after_exit=2)
+    assert schedule['deal_id'].tolist() == [0] * 6 + [1] * 8
+    for deal_id, exit_year in enumerate((3, 5)):
+        deal = value_deals(exit_year, 10e6, 4.0, 1e6, 0.5e6, 0.3, 0.15, 0.2)
+        rows = schedule['deal_id'] == deal_id
+        np.testing.assert_allclose(schedule['net_cash_flow'][rows].sum(),
+                                   deal['exit_proceeds'] - deal['investment_amount'])
+
+
+def test_anniversary_dates_roll_back_leap_day():
+    dates = anniversary_dates('2024-02-29', np.arange(5))
+    assert dates.astype(str).tolist() == ['2024-02-29', '2025-02-28', '2026-02-28', '2027-02-28', '2028-02-29']
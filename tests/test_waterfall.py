@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from waterfall import Waterfall, investor_payoff, investor_waterfall
+
+EXIT_VALUES = np.linspace(0.0, 5e7, 2001)
+
+TERMS = [
+    (1.0, False, None),
+    (2.0, False, None),
+    (1.0, True, None),
+    (1.0, True, 3.0),
+    (2.0, True, 2.5),
+    (1.5, True, 1.5)
+]
+
+
+@pytest.mark.parametrize('preference_multiple, participating, cap', TERMS)
+def test_closed_form_matches_waterfall(preference_multiple, participating, cap):
+    closed_form = investor_payoff(EXIT_VALUES, 0.2, 4e6, preference_multiple, participating, cap)
+    waterfall = investor_waterfall(0.2, 4e6, preference_multiple, participating, cap).payoff(EXIT_VALUES, 'investor')
+    np.testing.assert_allclose(closed_form, waterfall, rtol=6e-14, atol=1e-6)
+
+
+def test_payoffs_add_up_to_exit_value():
+    waterfall = Waterfall([
+        {'name': 'series_b', 'shares': 0.2, 'invested': 10e6, 'seniority': 2},
+        {'name': 'series_a', 'shares': 0.15, 'invested': 4e6, 'participating': True, 'cap': 3.0, 'seniority': 1},
+        {'name': 'seed', 'shares': 0.1, 'invested': 1e6, 'preference_multiple': 1.5, 'participating': True},
+        {'name': 'common', 'shares': 0.55, 'preference_multiple': 0.0}
+    ])
+    payoffs = waterfall.distribute(EXIT_VALUES)
+    np.testing.assert_allclose(payoffs.sum(axis=1), EXIT_VALUES, rtol=1e-12, atol=1e-6)
+    assert (np.diff(payoffs, axis=0) >= -1e-6).all()
+
+
+def test_preference_paid_before_common():
+    payoff = investor_payoff([0.0, 1e6, 3e6, 1e8], 0.1, 2e6, 1.0, False)
+    np.testing.assert_allclose(payoff, [0.0, 1e6, 2e6, 1e7])
+
+
+def test_cap_below_preference_is_rejected():
+    with pytest.raises(ValueError, match="at least the preference multiple"):
+        investor_payoff(EXIT_VALUES, 0.2, 4e6, 2.0, True, 1.5)
+    with pytest.raises(ValueError, match="at least the preference multiple"):
+        investor_waterfall(0.2, 4e6, 2.0, True, 1.5)
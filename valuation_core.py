@@ -0,0 +1,148 @@
+"""Pure valuation core: the VC method pipeline as array-in/array-out functions.
+
+Depends only on NumPy (and the NumPy IRR solver in irr.py) so batch jobs,
+benchmarks and tests can import it without loading Streamlit, Plotly or
+pandas. Every function accepts scalars or broadcastable arrays.
+"""
+import numpy as np
+
+from irr import irr_batch
+from waterfall import investor_payoff
+
+
+def calculate_present_value(future_value, discount_rate, years):
+    """Calculate present value using discount rate"""
+    return future_value / ((1 + discount_rate) ** years)
+
+
+def calculate_irr(cash_flows):
+    """Calculate Internal Rate of Return (NaN if the flows have no IRR)"""
+    return float(irr_batch([cash_flows])[0])
+
+
+def investor_cash_flows(investment_amount, exit_proceeds, exit_year):
+    """Yearly investor cash flows: investment today, proceeds at the exit year"""
+    cash_flows = [0.0] * (exit_year + 1)
+    cash_flows[0] = -investment_amount
+    cash_flows[exit_year] += exit_proceeds
+    return cash_flows
+
+
+def enterprise_value(exit_revenue, ev_revenue_multiple):
+    """Exit enterprise value from revenue and the EV/Revenue multiple"""
+    return exit_revenue * ev_revenue_multiple
+
+
+def equity_value(enterprise_value, financial_debt, cash_balance):
+    """Exit equity value: EV less net debt"""
+    return enterprise_value - financial_debt + cash_balance
+
+
+def equity_stake_exit(equity_stake_entry, dilution_effect):
+    """Investor ownership at exit after dilution"""
+    return equity_stake_entry * (1 - dilution_effect)
+
+
+def investor_returns(investment_amount, exit_proceeds, exit_year):
+    """Closed-form IRR and cash multiple of a single entry / single exit investment.
+
+    IRR is NaN where either flow is not positive; the multiple is 0 where
+    nothing is invested.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        multiple = exit_proceeds / investment_amount
+        irr = multiple ** (1 / exit_year) - 1
+    irr = np.where((investment_amount > 0) & (exit_proceeds > 0), irr, np.nan)
+    multiple = np.where(investment_amount > 0, multiple, 0.0)
+    return irr, multiple
+
+
+def value_deals(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                discount_rate, equity_stake_entry, dilution_effect, preference=None):
+    """Full pipeline EV -> equity -> PV -> investment -> exit proceeds -> IRR/multiple.
+
+    Inputs broadcast against each other, so the same call values one deal,
+    a vector of deals or a whole grid. preference is None for pro-rata exit
+    proceeds or (multiple, participating, cap) to pay the investor through
+    waterfall.investor_payoff. Returns a dict of result arrays.
+    """
+    ev = enterprise_value(exit_revenue, ev_revenue_multiple)
+    equity = equity_value(ev, financial_debt, cash_balance)
+    present_value = calculate_present_value(equity, discount_rate, exit_year)
+
+    stake_exit = equity_stake_exit(equity_stake_entry, dilution_effect)
+    investment_amount = present_value * equity_stake_entry
+    if preference is None:
+        exit_proceeds = equity * stake_exit
+    else:
+        exit_proceeds = investor_payoff(equity, stake_exit, investment_amount, *preference)
+    irr, multiple = investor_returns(investment_amount, exit_proceeds, exit_year)
+    return {
+        'enterprise_value': ev,
+        'equity_value': equity,
+        'present_value': present_value,
+        'equity_stake_exit': stake_exit,
+        'investment_amount': investment_amount,
+        'exit_proceeds': exit_proceeds,
+        'investor_irr': irr,
+        'cash_on_cash_multiple': multiple
+    }
+
+
+def anniversary_dates(start_date, years):
+    """start_date moved forward by each whole number of years (29-Feb rolls back to 28-Feb)"""
+    start = np.datetime64(start_date, 'D')
+    years = np.asarray(years)
+    month = start.astype('datetime64[M]') + 12 * years
+    days_in_month = ((month + 1).astype('datetime64[D]') - month.astype('datetime64[D]')).astype(int)
+    day_of_month = (start - start.astype('datetime64[M]').astype('datetime64[D]')).astype(int) + 1
+    return month.astype('datetime64[D]') + np.minimum(day_of_month, days_in_month) - 1
+
+
+def cash_flow_schedule(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                       discount_rate, equity_stake_entry, dilution_effect, years_after_exit=3, preference=None):
+    """Yearly projection and investor cash-flow rows for one or many deals.
+
+    Each deal gets rows for forecast years 0 .. exit_year + years_after_exit,
+    stacked into one long-format table keyed by 'deal_id' (the position of
+    the deal in the inputs). Values sit on the exit-year row, the investment
+    on year 0, and the equity stake is NaN after the exit. preference pays
+    the exit proceeds through the waterfall, as in value_deals. Returns a
+    dict of equal-length column arrays.
+    """
+    inputs = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+        exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+        discount_rate, equity_stake_entry, dilution_effect)))
+    (exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+     discount_rate, equity_stake_entry, dilution_effect) = inputs
+    deals = value_deals(exit_year, exit_revenue, ev_revenue_multiple, financial_debt, cash_balance,
+                        discount_rate, equity_stake_entry, dilution_effect, preference)
+
+    # One index array for every row of every deal
+    rows_per_deal = exit_year.astype(np.int64) + years_after_exit + 1
+    deal_id = np.repeat(np.arange(rows_per_deal.size), rows_per_deal)
+    first_row = np.cumsum(rows_per_deal) - rows_per_deal
+    forecast_year = np.arange(deal_id.size) - first_row[deal_id]
+
+    at_entry = forecast_year == 0
+    at_exit = forecast_year == exit_year[deal_id]
+    holding = forecast_year <= exit_year[deal_id]
+
+    def on_exit(values):
+        return np.where(at_exit, values[deal_id], 0.0)
+
+    investment = np.where(at_entry, -deals['investment_amount'][deal_id], 0.0)
+    exit_proceeds = on_exit(deals['exit_proceeds'])
+    return {
+        'deal_id': deal_id,
+        'forecast_year': forecast_year,
+        'revenue': on_exit(exit_revenue),
+        'enterprise_value': on_exit(deals['enterprise_value']),
+        'equity_value': on_exit(deals['equity_value']),
+        'discount_factor': (1 + discount_rate[deal_id]) ** -forecast_year.astype(float),
+        'present_value': on_exit(deals['present_value']),
+        'investment': investment,
+        'exit_proceeds': exit_proceeds,
+        'net_cash_flow': investment + exit_proceeds,
+        'equity_stake': np.where(holding, equity_stake_entry[deal_id], np.nan)
+    }
@@ -0,0 +1,156 @@
+"""Liquidation-preference waterfall evaluated on vectors of exit values.
+
+Every holder's payoff is a continuous piecewise-linear function of the
+exit equity value. Waterfall precomputes the breakpoints of that function
+once per capital structure, after which any number of exit values are
+distributed by binary search and linear interpolation (O(log n) each).
+
+Share classes are dicts with:
+    name                 label of the class
+    shares               as-converted common shares (or ownership fraction)
+    invested             amount invested (0 for common stock)
+    preference_multiple  liquidation preference as a multiple of invested
+    participating        True if the class also shares in the residual
+    cap                  participation cap as a multiple of invested (None = uncapped),
+                         at least preference_multiple
+    seniority            higher seniority is paid first; equal seniority is pari passu
+"""
+import numpy as np
+
+CLASS_DEFAULTS = {
+    'invested': 0.0,
+    'preference_multiple': 1.0,
+    'participating': False,
+    'cap': None,
+    'seniority': 0
+}
+
+
+class Waterfall:
+    """Breakpoint representation of a distribution waterfall"""
+
+    def __init__(self, classes):
+        self.classes = [{**CLASS_DEFAULTS, **share_class} for share_class in classes]
+        for share_class in self.classes:
+            if share_class['participating'] and share_class['cap'] is not None:
+                check_cap(share_class['preference_multiple'], share_class['cap'])
+        self.names = [share_class['name'] for share_class in self.classes]
+        shares = np.array([c['shares'] for c in self.classes], dtype=float)
+        preference = np.array([c['invested'] * c['preference_multiple'] for c in self.classes], dtype=float)
+
+        stack_values, stack_payoffs = self._preference_stack(preference)
+        residual_values, residual_payoffs = self._residual_phase(shares, preference)
+
+        self.breakpoints = np.concatenate([stack_values, residual_values[1:]])
+        self.payoff_table = np.vstack([stack_payoffs, residual_payoffs[1:]])
+        # Beyond the last breakpoint every class has converted to common
+        self.final_slope = shares / shares.sum()
+
+    def _preference_stack(self, preference):
+        """Exit values where each seniority tier is fully paid, and payoffs there"""
+        seniority = np.array([c['seniority'] for c in self.classes])
+        values = [0.0]
+        payoffs = [np.zeros(len(self.classes))]
+        for tier in sorted(set(seniority[preference > 0]), reverse=True):
+            paid = payoffs[-1].copy()
+            members = (seniority == tier) & (preference > 0)
+            paid[members] = preference[members]
+            values.append(values[-1] + preference[members].sum())
+            payoffs.append(paid)
+        return np.array(values), np.array(payoffs)
+
+    def _payoffs_at_price(self, price, shares, preference):
+        """Payoff of every class once all preferences are covered and common shares are worth price"""
+        as_converted = shares * price
+        payoffs = np.empty(len(self.classes))
+        for k, share_class in enumerate(self.classes):
+            if not share_class['participating']:
+                # Non-participating preferred converts when common is worth more
+                payoffs[k] = max(preference[k], as_converted[k])
+            elif share_class['cap'] is None:
+                payoffs[k] = preference[k] + as_converted[k]
+            else:
+                cap = share_class['cap'] * share_class['invested']
+                payoffs[k] = max(min(preference[k] + as_converted[k], cap), as_converted[k])
+        return payoffs
+
+    def _residual_phase(self, shares, preference):
+        """Exit values and payoffs at every common-share price where a class changes regime"""
+        prices = [0.0]
+        for k, share_class in enumerate(self.classes):
+            if shares[k] <= 0:
+                continue
+            if not share_class['participating']:
+                prices.append(preference[k] / shares[k])
+            elif share_class['cap'] is not None:
+                cap = share_class['cap'] * share_class['invested']
+                prices.extend([(cap - preference[k]) / shares[k], cap / shares[k]])
+        prices = np.unique(np.maximum(prices, 0.0))
+
+        payoffs = np.array([self._payoffs_at_price(price, shares, preference) for price in prices])
+        return payoffs.sum(axis=1), payoffs
+
+    def distribute(self, exit_values):
+        """Payoff of every class for each exit value, shape (len(exit_values), n_classes)"""
+        exit_values = np.maximum(np.asarray(exit_values, dtype=float), 0.0)
+        flat = exit_values.reshape(-1)
+        last = self.breakpoints.size - 1
+
+        segment = np.clip(np.searchsorted(self.breakpoints, flat, side='right') - 1, 0, max(last - 1, 0))
+        if last == 0:
+            payoffs = np.zeros((flat.size, len(self.classes)))
+        else:
+            low = self.breakpoints[segment]
+            width = self.breakpoints[segment + 1] - low
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fraction = np.where(width > 0, (flat - low) / width, 0.0)
+            fraction = np.clip(fraction, 0.0, 1.0)[:, None]
+            payoffs = (1 - fraction) * self.payoff_table[segment] + fraction * self.payoff_table[segment + 1]
+
+        beyond = flat > self.breakpoints[last]
+        if beyond.any():
+            excess = (flat[beyond] - self.breakpoints[last])[:, None]
+            payoffs[beyond] = self.payoff_table[last] + excess * self.final_slope
+        return payoffs.reshape(exit_values.shape + (len(self.classes),))
+
+    def payoff(self, exit_values, name):
+        """Payoff of one class for each exit value"""
+        return self.distribute(exit_values)[..., self.names.index(name)]
+
+
+def check_cap(preference_multiple, cap):
+    """Reject a participation cap below the preference, which would pay less as the exit grows"""
+    if np.any(np.asarray(cap, dtype=float) < np.asarray(preference_multiple, dtype=float)):
+        raise ValueError("Participation cap must be at least the preference multiple")
+
+
+def investor_waterfall(equity_stake, invested, preference_multiple=1.0, participating=False, cap=None):
+    """Two-class structure: the investor's preferred shares ahead of everyone else as common"""
+    return Waterfall([
+        {'name': 'investor', 'shares': equity_stake, 'invested': invested,
+         'preference_multiple': preference_multiple, 'participating': participating, 'cap': cap},
+        {'name': 'common', 'shares': 1 - equity_stake, 'preference_multiple': 0.0}
+    ])
+
+
+def investor_payoff(exit_equity, equity_stake, invested, preference_multiple=1.0, participating=False, cap=None):
+    """Closed-form investor payoff of investor_waterfall, broadcast over every argument.
+
+    With one preferred class ahead of common the breakpoints are explicit:
+    the preference P is paid first, then a participating investor takes
+    its stake of the residual (up to the cap unless converting pays more)
+    and a non-participating one takes the larger of P and its stake of the
+    whole exit.
+    """
+    exit_equity = np.maximum(np.asarray(exit_equity, dtype=float), 0.0)
+    equity_stake = np.asarray(equity_stake, dtype=float)
+    preference = np.asarray(invested, dtype=float) * preference_multiple
+    as_converted = equity_stake * exit_equity
+    participating = np.asarray(participating, dtype=bool)
+    participation = preference + equity_stake * (exit_equity - preference)
+    if cap is not None:
+        check_cap(preference_multiple, cap)
+        capped = np.minimum(participation, np.asarray(cap, dtype=float) * invested)
+        participation = np.maximum(capped, as_converted)
+    payoff = np.where(participating, participation, np.maximum(preference, as_converted))
+    return np.where(exit_equity <= preference, exit_equity, payoff)